@@ -2,43 +2,49 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import re
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from thefuzz import process, fuzz
-from deep_translator import GoogleTranslator
-from io import BytesIO
-from PIL import Image
 import os
 import time
 import base64
-import string
-import unicodedata
+import hashlib
+import logging
+import sys
+import oct_core as core
+from oct_core import (
+    load_settings, empty_settings, guess_columns, get_translation_cache, read_sheet, process_frame,
+    result_digest, parquet_available, EXPORT_FORMATS, validate_item, search_token_wise_core, VALIDATION_WORKERS,
+    settings_status, run_report, stage, log_report, iter_chunks, merge_run_stats, format_run_notes,
+    RESULT_FILTERS, RESULT_PAGE_SIZES, filter_rows, result_page, changed_rows, apply_edits, edit_digest,
+    BatchQueue,
+)
 
 # -----------------------------------------------------------------------------
 # 1. CONFIGURATION
 # -----------------------------------------------------------------------------
 
-page_icon = "🍊"
-if os.path.exists("logo.png"):
-    page_icon = Image.open("logo.png")
+# Run reports go to stdout as one JSON line per bulk run
+if not core.logger.handlers:
+    core.logger.addHandler(logging.StreamHandler(sys.stdout))
+    core.logger.setLevel(logging.INFO)
+
+# --- STATIC ASSETS ---
+# The logo is encoded once per server process and shared by every session; the data URI doubles
+# as the favicon, so the PNG is no longer decoded and re-encoded on every rerun.
+@st.cache_resource(show_spinner=False)
+def get_img_as_base64(file):
+    if not os.path.exists(file): return ""
+    with open(file, "rb") as f:
+        data = f.read()
+    return f"data:image/png;base64,{base64.b64encode(data).decode()}"
+
+logo_base64 = get_img_as_base64("logo.png")
 
 st.set_page_config(
     page_title="OCT VALIDATOR", 
     layout="wide", 
-    page_icon=page_icon,
+    page_icon=logo_base64 or "🍊",
     initial_sidebar_state="expanded"
 )
 
-# --- HELPER: IMAGE TO BASE64 ---
-def get_img_as_base64(file):
-    with open(file, "rb") as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
-
-logo_base64 = ""
-if os.path.exists("logo.png"):
-    logo_base64 = f"data:image/png;base64,{get_img_as_base64('logo.png')}"
-
 # -----------------------------------------------------------------------------
 # 2. CSS STYLING
 # -----------------------------------------------------------------------------
@@ -100,337 +106,107 @@ st.markdown("""<ul class="circles"><li></li><li></li><li></li><li></li><li></li>
 # 3. LOGIC & DATA
 # -----------------------------------------------------------------------------
 
-def normalize_text(text):
-    if not isinstance(text, str): return str(text)
-    text = unicodedata.normalize('NFKC', text)
-    text = text.lower()
-    text = re.sub(r'[\u064B-\u065F\u0640]', '', text) 
-    text = re.sub("[إأآا]", "ا", text)
-    text = re.sub("ة", "ه", text)
-    text = re.sub("ى", "ي", text)
-    text = re.sub(r'[^\w\s\u0600-\u06FF]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-def strip_text(text):
-    if not isinstance(text, str): return str(text)
-    norm = normalize_text(text)
-    return re.sub(r'\s+', '', norm)
-
-@st.cache_data(ttl=3600, show_spinner=False)
-def fetch_settings_data():
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds = None
-    try: creds = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", scope)
-    except:
-        try: creds = ServiceAccountCredentials.from_json_keyfile_dict(dict(st.secrets["gcp_service_account"]), scope)
-        except: pass
-
-    empty_res = (False, [], [], [], {}, {}, {}, pd.DataFrame(), [], [])
-    if not creds: return empty_res
-
-    client = gspread.authorize(creds)
-    SETTINGS_ID = "15YTSsTS7xspjzyfRWI9vVdiKAMxY125sGinpF4NeTD0" 
-    
-    try:
-        sh = client.open_by_key(SETTINGS_ID)
-        
-        def find_worksheet_case_insensitive(sheet_name):
-            all_sheets = sh.worksheets()
-            for ws in all_sheets:
-                if ws.title.strip().lower() == sheet_name.strip().lower(): return ws
-            return None
-
-        def get_data(sheet_names_list, skip_row=False):
-            wks = None
-            for name in sheet_names_list:
-                wks = find_worksheet_case_insensitive(name)
-                if wks: break
-            if not wks: return []
-            rows = wks.get_all_values()
-            if not rows: return []
-            data = rows[1:] if skip_row and len(rows) > 1 else rows
-            clean = [str(cell).strip().lower() for row in data for cell in row if str(cell).strip()]
-            return clean
-
-        generic_words = get_data(["Generic_Words", "Generic"], False)
-        ad_words_raw = get_data(["Ad_Words", "Ads"], False)
-        ad_words = set([normalize_text(w) for w in ad_words_raw])
-        forbidden_words = get_data(["Forbidden_Words", "Forbidden"], True)
-        safe_bacon = get_data(["Safe_Bacon", "Safe Bacon"], False) 
-        safe_curacao = get_data(["Safe_Curacao", "Safe Curacao"], False)
-
-        term_dict = {}
-        stripped_term_dict = {}
-        debug_table = []
-        
-        term_wks = find_worksheet_case_insensitive("Terminology")
-        if term_wks:
-            raw_term = term_wks.get_all_values()
-            if len(raw_term) > 1:
-                # Column A = English, Column B = Arabic
-                for r in raw_term[1:]: 
-                    if len(r) >= 2:
-                        src, tgt = str(r[0]), str(r[1])
-                        if src.strip() and tgt.strip():
-                            n_src = normalize_text(src)
-                            n_tgt = normalize_text(tgt)
-                            s_src = strip_text(src)
-                            s_tgt = strip_text(tgt)
-                            
-                            term_dict[n_src] = tgt.strip()
-                            term_dict[n_tgt] = src.strip()
-                            stripped_term_dict[s_src] = tgt.strip()
-                            stripped_term_dict[s_tgt] = src.strip()
-                            
-                            debug_table.append({"En": src, "Ar": tgt})
-
-        desc_lib_df = pd.DataFrame(columns=['Item Name', 'Eng Desc', 'Arb Desc'])
-        lib_wks = find_worksheet_case_insensitive("Description_Library")
-        if lib_wks:
-            raw_lib = lib_wks.get_all_values()
-            clean_lib = []
-            if len(raw_lib) > 1:
-                for r in raw_lib[1:]:
-                    if len(r) >= 3: clean_lib.append([r[0].strip(), r[1].strip(), r[2].strip()])
-                    elif len(r) == 2: clean_lib.append([r[0].strip(), r[1].strip(), ""])
-            if clean_lib:
-                desc_lib_df = pd.DataFrame(clean_lib, columns=['Item Name', 'Eng Desc', 'Arb Desc'])
-
-        return True, debug_table, generic_words, forbidden_words, ad_words, term_dict, stripped_term_dict, desc_lib_df, safe_bacon, safe_curacao
-
-    except Exception as e: 
-        return False, [], [], [], {}, {}, {}, pd.DataFrame(), [], []
-
-# --- TRANSLATION HELPER (THE FIX IS HERE) ---
-def translate_word_safe(word, src_lang, tgt_lang):
-    word_clean = word.strip()
-    if not word_clean: return ""
-    prompts = [f"Food: {word_clean}", word_clean]
-    if src_lang == 'ar': prompts = [f"Food item: {word_clean}", word_clean]
-    for prompt in prompts:
-        try:
-            tr = GoogleTranslator(source='auto', target=tgt_lang).translate(prompt)
-            # CRITICAL FIX: AGGRESSIVE CLEANING OF "FOOD:" PREFIXES IN ARABIC & ENGLISH
-            tr_clean = re.sub(r'^(Food item|Food|Dish|Item|طعام|الطعام|غذاء|الغذاء|الأكل|وجبة|صنف)[:\s\-\.]*', '', tr, flags=re.IGNORECASE).strip()
-            return tr_clean
-        except: continue
-    return word_clean
-
-# --- SEARCH LOGIC (Token-wise) ---
-def search_token_wise_core(input_word, term_dict, stripped_term_dict, allow_google, source_lang):
-    if not input_word: return "", ""
-    
-    norm_input = normalize_text(input_word)
-    stripped = strip_text(input_word)
-    
-    # 1. Exact & Stripped
-    if norm_input in term_dict: return term_dict[norm_input], "Terminology (Exact)"
-    if stripped in stripped_term_dict: return stripped_term_dict[stripped], "Terminology (Stripped)"
-    
-    # 2. Singular/Plural
-    if norm_input.endswith('s') and len(norm_input) > 3:
-        sing = norm_input[:-1]
-        if sing in term_dict: return term_dict[sing], "Terminology (Singular)"
-    
-    # 3. Token-wise Fuzzy
-    best_match_val = None
-    best_match_score = 0
-    for key, val in term_dict.items():
-        key_tokens = key.split()
-        for token in key_tokens:
-            score = fuzz.ratio(norm_input, token)
-            if score >= 90: return val, "Terminology (Token Match)"
-            if score > best_match_score:
-                best_match_score = score
-                best_match_val = val
-
-    # 4. Fuzzy
-    if best_match_score >= 85: return best_match_val, "Terminology (Fuzzy)"
-
-    # 5. Google
-    if allow_google:
-        tgt = 'ar' if source_lang == 'English' else 'en'
-        try:
-            # Use the SAFE translate function to strip "Food:"
-            res = translate_word_safe(input_word, source_lang, tgt)
-            return res, "Google"
-        except:
-            return "Error", "Connection"
-    else:
-        return input_word, "Not Found"
+# The engine lives in oct_core.py (no Streamlit import, shared with oct_cli.py); this section
+# only adds Streamlit caching and session handling around it.
 
-# --- BULK TRANSLATION ---
-def translate_text_with_priority(text, term_dict, stripped_term_dict, source_lang):
-    if not text or pd.isna(text): return text, "None"
-    text_str = str(text).strip()
-    norm = normalize_text(text_str)
-    
-    # 1. Full Sentence Check
-    if norm in term_dict: return term_dict[norm], "Terminology"
-    if strip_text(text_str) in stripped_term_dict: return stripped_term_dict[strip_text(text_str)], "Terminology"
-    
-    # 2. Squeeze Algorithm
-    all_keys = sorted(term_dict.keys(), key=len, reverse=True)
-    placeholders = {}
-    counter = 1000
-    used_terminology = False
-    
-    processing_text = norm 
-    
-    for key in all_keys:
-        if len(key) < 3: continue 
-        if key in processing_text:
-            token = f" __{counter}__ "
-            placeholders[token.strip()] = term_dict[key]
-            processing_text = processing_text.replace(key, token)
-            counter += 1
-            used_terminology = True
-            
-    chunks = processing_text.split()
-    final_output_parts = []
-    
-    tgt_code = 'ar' if source_lang == 'English' else 'en'
-    src_code = 'en' if source_lang == 'English' else 'ar'
-    used_google = False
-    
-    for chunk in chunks:
-        if re.match(r'^__\d+__$', chunk):
-            if chunk in placeholders:
-                final_output_parts.append(placeholders[chunk])
-            else:
-                final_output_parts.append(chunk)
-        else:
-            if len(chunk) < 2 and not chunk.isdigit(): continue
-            try:
-                # Use SAFE translate here too
-                tr = translate_word_safe(chunk, src_code, tgt_code)
-                final_output_parts.append(tr)
-                used_google = True
-            except:
-                final_output_parts.append(chunk)
-            
-    final_text = " ".join(final_output_parts)
-    final_text = re.sub(r'\s+', ' ', final_text).strip()
-    
-    return final_text, "Terminology + Google" if used_google else "Terminology"
-
-# --- VALIDATION ---
-def check_mismatch(name, desc):
-    n = name.lower()
-    d = desc.lower()
-    conflicts = [
-        (['chicken', 'poultry'], ['beef', 'meat', 'lamb', 'fish', 'seafood', 'prawn', 'shrimp']),
-        (['beef', 'meat', 'lamb', 'steak'], ['chicken', 'poultry', 'fish', 'seafood', 'prawn', 'shrimp']),
-        (['fish', 'seafood', 'prawn', 'shrimp', 'salmon', 'tuna'], ['chicken', 'poultry', 'beef', 'meat', 'lamb']),
-        (['vegetable', 'veggie', 'vegan'], ['chicken', 'beef', 'meat', 'lamb', 'fish', 'bacon', 'prawn']),
-        (['hot', 'warm', 'steamed', 'grilled'], ['iced', 'cold', 'frozen', 'chilled', 'frosty']),
-        (['iced', 'cold', 'frozen', 'chilled'], ['hot', 'warm', 'steamed']),
-        (['mocha', 'latte', 'coffee', 'espresso', 'cappuccino', 'frappe', 'macchiato'], 
-         ['beef', 'chicken', 'meat', 'lamb', 'burger', 'steak', 'fish', 'prawn', 'rice', 'pasta', 'sandwich'])
-    ]
-    for set_a, set_b in conflicts:
-        has_a_name = any(x in n for x in set_a)
-        has_b_desc = any(x in d for x in set_b)
-        if has_a_name and has_b_desc:
-            if 'bacon' in d and ('beef' in d or 'turkey' in d): continue
-            return True, f"Mismatch: Name implies '{set_a[0]}' but Desc implies '{set_b[0]}'"
-    return False, ""
-
-def validate_item(row, sheet_type, generic_words, forbidden_words, ad_words, desc_lib_df, safe_bacon_list, safe_curacao_list):
-    item_name = str(row.get('Item Name', '')).strip()
-    description = str(row.get('Description', '')).strip()
-    desc_raw_lower = description.lower()
-    name_norm = normalize_text(item_name)
-    desc_norm = normalize_text(description)
-    combined_text = (name_norm + " " + desc_norm).lower()
-    
-    default_safe_bacon = ['beef', 'turkey', 'veal', 'halal', 'chicken', 'lamb']
-    default_safe_curacao = ['syrup', 'flavor', 'flavour', 'mix', 'mocktail', 'virgin']
-    final_safe_bacon = list(set(safe_bacon_list + default_safe_bacon)) if safe_bacon_list else default_safe_bacon
-    final_safe_curacao = list(set(safe_curacao_list + default_safe_curacao)) if safe_curacao_list else default_safe_curacao
-
-    def get_suggestions(itm_name):
-        if desc_lib_df.empty: return []
-        match = process.extractOne(itm_name, desc_lib_df['Item Name'].astype(str).unique(), scorer=fuzz.token_sort_ratio)
-        if match and match[1] >= 90:
-            matches = desc_lib_df[desc_lib_df['Item Name'] == match[0]]
-            if not matches.empty:
-                return [f"🇬🇧 {r['Eng Desc']}\n\n🇸🇦 {r['Arb Desc']}" for _, r in matches.iterrows()]
-        return []
-
-    # 1. FORBIDDEN
-    check_forbidden = forbidden_words + ['pig', 'ham', 'naughty', 'dirty', 'fucking']
-    bacon_is_safe = False
-    if 'bacon' in combined_text:
-        if any(safe in combined_text for safe in final_safe_bacon): bacon_is_safe = True
-    curacao_is_safe = False
-    if 'curacao' in combined_text:
-        if any(safe in combined_text for safe in final_safe_curacao): curacao_is_safe = True
-
-    for word in check_forbidden:
-        w_clean = normalize_text(word)
-        if not w_clean: continue
-        if w_clean in name_norm:
-             if w_clean == 'bacon' and bacon_is_safe: continue
-             if (w_clean == 'blue curacao' or w_clean == 'curacao') and curacao_is_safe: continue
-             return False, row, f"Forbidden in Name: {word}", "Delete Item", []
-        if w_clean in desc_norm:
-             if w_clean == 'bacon' and bacon_is_safe: continue
-             if (w_clean == 'blue curacao' or w_clean == 'curacao') and curacao_is_safe: continue
-             return False, row, f"Forbidden in Desc: {word}", "Delete Desc & Replace", get_suggestions(item_name)
-
-    # 2. CHOICES
-    choice_separators = ['/', '\\', ' or ', ' OR ']
-    has_separator = any(s in desc_raw_lower for s in choice_separators)
-    choice_indicators = ['choice of', 'choice between', 'choose', 'your choice']
-    has_indicator = any(i in desc_norm for i in choice_indicators)
-    is_between_and = ('between' in desc_norm and 'and' in desc_norm)
-    name_has_option_keyword = any(x in item_name.lower() for x in [' or ', '/', ' & '])
-    set_score = fuzz.token_set_ratio(name_norm, desc_norm)
-    is_valid_choice = (set_score >= 80) or (name_has_option_keyword and set_score >= 60)
-    
-    if (has_indicator or has_separator or is_between_and) and not is_valid_choice:
-         if sheet_type == "Main Menu":
-             if (has_indicator or is_between_and) and not has_separator:
-                 return False, row, "Undefined Choice", "Delete Item", []
-         else:
-             return False, row, "Choices in SEP", "Delete Description", []
-
-    # 3. MISMATCH & GENERIC
-    is_mismatch, mis_msg = check_mismatch(name_norm, desc_norm)
-    if is_mismatch:
-        if sheet_type == "Main Menu": return False, row, mis_msg, "Delete Item", []
-        else: return False, row, mis_msg, "Delete Desc & Replace", get_suggestions(item_name)
-
-    for word in generic_words:
-        w_clean = normalize_text(word)
-        if w_clean and w_clean in combined_text:
-            if sheet_type == "Main Menu": return False, row, f"Generic: {word}", "Delete Item", []
-            else: return False, row, f"Generic: {word}", "Delete Desc & Replace", get_suggestions(item_name)
-
-    # 4. VALUE ADDED
-    name_tokens = set(name_norm.split())
-    desc_tokens = set(desc_norm.split())
-    extra_words = desc_tokens - name_tokens
-    
-    common_fillers = {'delicious', 'tasty', 'yummy', 'amazing', 'great', 'best', 'famous', 'signature', 'special', 
-                      'fresh', 'hot', 'cold', 'served', 'with', 'dish', 'plate', 'platter', 'bowl', 'cup', 'glass', 'our'}
-    junk_fillers = common_fillers - ad_words
-    
-    if extra_words:
-        all_extras_are_junk = True
-        for w in extra_words:
-            if w not in junk_fillers:
-                all_extras_are_junk = False
-                break
-        if all_extras_are_junk:
-             return False, row, "No Value Added", "Delete Desc & Replace", get_suggestions(item_name)
-    else:
-        if fuzz.ratio(name_norm, desc_norm) > 90 and len(desc_norm) > 5:
-             return False, row, "Identical to Name", "Delete Desc & Replace", get_suggestions(item_name)
-
-    return True, row, "", "Valid", []
+# --- SETTINGS ---
+# One compiled, read-only Settings per server process, shared by every session (cache_resource
+# hands out the object itself, not a per-session copy). Sessions only keep its version.
+@st.cache_resource(ttl=3600, show_spinner=False)
+def fetch_settings_data():
+    creds_info = None
+    try: creds_info = dict(st.secrets["gcp_service_account"])
+    except: pass
+    return load_settings(creds_info)
+
+# --- WORKBOOK INGESTION ---
+# An upload is hashed once; sheet names and column previews are cached by that hash.
+def upload_digest(uploaded_file):
+    digests = st.session_state.setdefault('upload_digests', {})
+    if uploaded_file.file_id not in digests:
+        digests.clear()
+        digests[uploaded_file.file_id] = hashlib.sha1(uploaded_file.getbuffer()).hexdigest()
+    return digests[uploaded_file.file_id]
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def workbook_sheet_names(digest, _data):
+    return core.workbook_sheet_names(_data)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def sheet_columns(digest, _data, is_csv, sheet):
+    return core.sheet_columns(_data, is_csv, sheet)
+
+# --- CHUNKED BULK RUNS ---
+def cancel_bulk_job():
+    job = st.session_state.get('bulk_job')
+    if job: job['cancelled'] = True
+
+def progress_text(done, todo, secs, end, total):
+    rate = done / secs if secs > 0 else 0
+    eta = (todo - done) / rate if rate else 0
+    return f"{end:,} / {total:,} rows · {rate:,.0f} rows/s · ETA {int(eta // 60)}:{int(eta % 60):02d}"
+
+# --- BATCH QUEUE ---
+# Multi-file runs go to a BatchQueue in session state; its threads keep working between reruns
+# and the panel polls them from a fragment, so the rest of the page is not redrawn.
+def cancel_batch():
+    batch = st.session_state.get('batch')
+    if batch: batch.cancel()
+
+def batch_panel():
+    batch = st.session_state.get('batch')
+    if not batch: return
+    jobs = batch.snapshot()
+    finished = sum(j['status'] in core.BATCH_DONE for j in jobs)
+    rows = sum(j['rows'] for j in jobs)
+    secs = time.time() - batch.started
+    st.progress(finished / max(len(jobs), 1), text=f"{finished} / {len(jobs)} files · {rows:,} rows · {rows / secs if secs > 0 else 0:,.0f} rows/s")
+    table = pd.DataFrame(jobs, columns=['file', 'status', 'rows', 'issues', 'seconds', 'rows_per_s', 'notes', 'error'])
+    st.dataframe(table, hide_index=True, width="stretch", column_config={'seconds': st.column_config.NumberColumn(format="%.1f")})
+    # Once everything is done, a full rerun stops the polling and shows the download
+    if finished == len(jobs) and st.session_state.get('batch_polling'):
+        st.session_state.batch_polling = False
+        st.rerun()
+
+# --- RUN REPORT ---
+def render_run_report(rep):
+    with st.expander("📈 Run Report", expanded=False):
+        st.caption(f"{rep['file']} · {rep['rows']} rows in {rep['seconds']:.2f}s ({rep['rows_per_s'] or '-'} rows/s)")
+        mem = rep.get('memory')
+        if mem:
+            grown = f", +{mem['run_mb']:,.0f} MB this run" if mem['run_mb'] is not None else ""
+            mem_text = f"Peak memory {mem['peak_mb']:,.0f} MB (server process{grown}) of a {mem['budget_mb']:,.0f} MB budget"
+            if mem['over_budget']: st.warning(mem_text)
+            else: st.caption(mem_text)
+        st.markdown("**Stages (s)**")
+        st.table({"Seconds": rep['stages']})
+        if rep['rules']:
+            st.markdown("**Validation rules (s)**")
+            st.table({"Seconds": rep['rules']})
+        counters = rep['counters']
+        if any(k.startswith('mt.') for k in counters):
+            st.caption(f"Google calls: {counters.get('mt.requests', 0)} · retries: {counters.get('mt.retries', 0)} · failures: {counters.get('mt.failures', 0)} · memory hits: {counters.get('mt.cache_hits', 0)}")
+        hits = {k.split('.', 1)[1]: v for k, v in counters.items() if k.startswith('terminology.')}
+        if hits: st.caption("Terminology hits: " + " · ".join(f"{k} {v}" for k, v in hits.items()))
+
+# --- EXPORT ---
+# Export bytes are built once per processed result and cached by its content hash, so reruns
+# (every widget click) reuse them.
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_bytes(digest, fmt, _df, _source=None):
+    return core.export_bytes(_df, fmt, _source)
+
+# --- RESULTS GRID ---
+# The filter index is built once per processed result (keyed by its content hash).
+@st.cache_data(show_spinner=False, max_entries=8)
+def result_index(digest, _df):
+    return core.build_result_index(_df)
+
+def issue_styles(page_df):
+    # Whole-page style mask for Styler.apply(axis=None): issue rows shaded, every cell in black text
+    styles = np.full(page_df.shape, 'color: black', dtype=object)
+    if 'Status' in page_df.columns: styles[(page_df['Status'] == 'Issue').to_numpy()] = 'background-color: #ffe6e6; color: black'
+    return pd.DataFrame(styles, index=page_df.index, columns=page_df.columns)
 
 # -----------------------------------------------------------------------------
 # 4. MAIN LAYOUT
@@ -445,65 +221,69 @@ def main():
         placeholder.markdown(f"""<div id="loading-overlay"><div class="loading-content">{img_tag}<div class="loading-text">Loading...</div></div></div>""", unsafe_allow_html=True)
         
         settings_res = fetch_settings_data()
-        time.sleep(1.0)
         placeholder.empty()
         st.session_state.first_load = True
-        st.session_state.settings_data = settings_res
     else:
-        settings_res = st.session_state.settings_data
+        settings_res = fetch_settings_data()
+    if st.session_state.get('settings_version') not in (None, settings_res.version): st.toast("Settings were updated.")
+    st.session_state.settings_version = settings_res.version
 
     if settings_res[0] == False:
         conn_status = False
         conn_msg = settings_res[1]
-        debug_table, generic_words, forbidden_words, ad_words, term_dict, stripped_term_dict, desc_lib_df, safe_bacon, safe_curacao = [], [], [], set(), {}, {}, pd.DataFrame(), [], []
+        settings_res = empty_settings()
     else:
         conn_status = True
         conn_msg = "Connected"
-        debug_table, generic_words, forbidden_words, ad_words, term_dict, stripped_term_dict, desc_lib_df, safe_bacon, safe_curacao = settings_res[1:]
+    _, debug_table, generic_words, forbidden_words, ad_words, term_dict, stripped_term_dict, desc_lib_df, safe_bacon, safe_curacao, term_index, term_matcher, suggestion_index, _ = settings_res
 
     with st.sidebar:
         col_res, col_tit = st.columns([0.3, 0.7])
         with col_res:
             if st.button("Reset", key="reset_btn", type="secondary"):
                 st.session_state.processed_data = None
+                st.session_state.run_report = None
+                st.session_state.bulk_job = None
+                cancel_batch()
+                st.session_state.batch = None
                 st.rerun()
         
         st.markdown("### ⚙️ Bulk Operations")
         if st.button("🔄 Update Data", key="update_btn", type="secondary"):
-            st.cache_data.clear()
+            fetch_settings_data.clear()
             st.rerun()
+        if settings_status['origin'] == 'snapshot':
+            st.caption(f"Offline: using settings saved {time.strftime('%Y-%m-%d %H:%M', time.localtime(settings_status['fetched_at']))}")
             
         sidebar_menu_type = st.radio("Sheet Type", ["Main Menu", "Sep Sheet"], key="bk_type")
-        uploaded_file = st.file_uploader("Upload Menu", type=['xlsx', 'csv'])
+        batch_mode = st.toggle("Multi-file batch", key="batch_mode", help="Queue several menus; each is processed on its first sheet with guessed columns.")
+        if batch_mode:
+            batch_files = st.file_uploader("Upload Menus", type=['xlsx', 'csv'], accept_multiple_files=True, key="batch_files")
+            uploaded_file = None
+        else: uploaded_file = st.file_uploader("Upload Menu", type=['xlsx', 'csv'])
         
         col_name_mapped = 'Item Name'
         col_desc_mapped = 'Description'
         selected_sheet = 0
         all_cols = []
+        upload_data, is_csv, sheet_names = None, False, ["Sheet1"]
+        upload_hash = None
         
         if uploaded_file:
             try:
-                uploaded_file.seek(0)
+                upload_data = uploaded_file.getvalue()
+                upload_hash = upload_digest(uploaded_file)
+                is_csv = uploaded_file.name.endswith('.csv')
+                sheet_names = ["Sheet1"]
                 if uploaded_file.name.endswith(('.xlsx', '.xls')):
-                    xl_file = pd.ExcelFile(uploaded_file)
-                    sheet_names = xl_file.sheet_names
+                    sheet_names = workbook_sheet_names(upload_hash, upload_data)
                     st.markdown("---")
                     selected_sheet = st.selectbox("📑 Select Sheet:", range(len(sheet_names)), format_func=lambda x: sheet_names[x])
                 
-                uploaded_file.seek(0)
-                if uploaded_file.name.endswith('.csv'): 
-                    df_preview = pd.read_csv(uploaded_file, nrows=5)
-                else: 
-                    df_preview = pd.read_excel(uploaded_file, sheet_name=selected_sheet, nrows=5)
-                
-                all_cols = df_preview.columns.tolist()
+                all_cols = sheet_columns(upload_hash, upload_data, is_csv, selected_sheet)
                 st.markdown("---")
                 st.markdown("**📂 Map Columns**")
-                idx_n, idx_d = 0, 0
-                for i, col in enumerate(all_cols):
-                    c_lower = str(col).lower()
-                    if 'item' in c_lower or 'name' in c_lower: idx_n = i
-                    if 'desc' in c_lower: idx_d = i
+                idx_n, idx_d = guess_columns(all_cols)
                 col_name_sel = st.selectbox("Item Name:", all_cols, index=idx_n)
                 col_desc_sel = st.selectbox("Description:", all_cols, index=idx_d)
                 col_name_mapped = col_name_sel
@@ -512,6 +292,10 @@ def main():
             except Exception as e: st.error(f"Error: {e}")
 
         action_mode = st.radio("Action", ["Check Errors Only", "Translate Only", "Check & Translate"])
+        cpu_count = os.cpu_count() or 1
+        val_workers = 1
+        if "Check" in action_mode and cpu_count > 1:
+            val_workers = st.number_input("Validation workers", 1, cpu_count, min(VALIDATION_WORKERS, cpu_count), help="Processes used to validate large sheets in parallel.")
         
         source_lang = "English"
         target_name_col = "Name (Arb)"
@@ -519,6 +303,8 @@ def main():
         
         if "Translate" in action_mode:
             st.markdown("#### 🌐 Translation Settings")
+            tm_stats = get_translation_cache().stats()
+            st.caption(f"Translation memory: {tm_stats['size']} stored · {tm_stats['hits']} hits · {tm_stats['misses']} misses")
             source_lang = st.radio("Source Language:", ["English", "Arabic"])
             st.caption("Select Target Columns (Overwrite):")
             
@@ -528,64 +314,97 @@ def main():
             target_name_col = sel_target_name if sel_target_name != "(Create New Column)" else "Name (Translated)"
             target_desc_col = sel_target_desc if sel_target_desc != "(Create New Column)" else "Desc (Translated)"
 
-        if st.button("Run Bulk Processor", type="primary"):
+        # A bulk run is a job processed in chunks; finished chunks live in session state, so a
+        # cancelled or interrupted run picks up from the last completed chunk. A settings update
+        # changes the key, so chunks checked against different rules are never mixed.
+        job_key = (upload_hash, settings_res.version, selected_sheet, col_name_mapped, col_desc_mapped, sidebar_menu_type, action_mode, source_lang, target_name_col, target_desc_col) if uploaded_file else None
+        job = st.session_state.get('bulk_job')
+        if job and job['key'] != job_key: job = None
+        if job:
+            st.info(f"{'Cancelled' if job['cancelled'] else 'Interrupted'} at {job['next']:,} / {job['total']:,} rows. Resume continues from there.")
+            if st.button("Start Over", key="discard_job", type="secondary"):
+                st.session_state.bulk_job = job = None
+
+        # Batch mode: one job per file on a bounded thread pool, sharing the process-wide translation rate limit
+        batch = st.session_state.get('batch')
+        if batch_mode:
+            running = batch and not batch.finished()
+            if st.button(f"Queue {len(batch_files)} Menus" if batch_files else "Queue Menus", key="run_batch", type="primary", disabled=bool(running)):
+                if batch_files and conn_status:
+                    opts = {'sheet': None, 'name_col': None, 'desc_col': None, 'sheet_type': sidebar_menu_type, 'action_mode': action_mode,
+                            'source_lang': source_lang, 'target_name_col': target_name_col, 'target_desc_col': target_desc_col, 'workers': 1}
+                    batch = st.session_state.batch = BatchQueue(settings_res, opts)
+                    try:
+                        for f in batch_files: batch.submit(f.name, f.getvalue())
+                    except ValueError as e: st.warning(str(e))
+                    st.session_state.batch_polling = True
+                elif not conn_status: st.error("Connection Error.")
+            if running: st.button("⏹ Cancel Batch", key="cancel_batch", on_click=cancel_batch)
+
+        if not batch_mode and st.button("Resume Bulk Processor" if job else "Run Bulk Processor", key="run_bulk", type="primary"):
             if uploaded_file and conn_status:
-                spin_html = f'<div class="loading-content"><img src="{logo_base64}" class="action-logo-spin"/><div class="loading-text">Processing...</div></div>' if logo_base64 else '🍊'
-                spin_ph = st.empty()
-                spin_ph.markdown(f'<div id="action-overlay">{spin_html}</div>', unsafe_allow_html=True)
-                
-                try:
-                    uploaded_file.seek(0)
-                    if uploaded_file.name.endswith('.csv'): 
-                        df = pd.read_csv(uploaded_file)
-                        all_sheets = { "Sheet1": df }
-                        current_sheet_name = "Sheet1"
-                    else: 
-                        all_sheets = pd.read_excel(uploaded_file, sheet_name=None)
-                        sheet_keys = list(all_sheets.keys())
-                        current_sheet_name = sheet_keys[selected_sheet]
-                        df = all_sheets[current_sheet_name]
-                    
-                    df.rename(columns={col_name_mapped: 'Item Name', col_desc_mapped: 'Description'}, inplace=True)
-                    
-                    if 'Item Name' not in df.columns: st.error("Error mapping columns.")
+                with run_report(uploaded_file.name) as report:
+                    current_sheet_name = sheet_names[selected_sheet]
+                    with stage('read'): df = read_sheet(upload_data, is_csv, selected_sheet)
+                    if not job: job = {'key': job_key, 'total': len(df), 'next': 0, 'parts': [], 'stats': {'rows': 0}, 'chunks': 0}
+                    job['cancelled'] = False
+                    st.session_state.bulk_job = job
+
+                    resumed_at, t0 = job['next'], time.time()
+                    progress = st.progress(job['next'] / max(job['total'], 1), text=f"{job['next']:,} / {job['total']:,} rows")
+                    cancel_ph = st.empty()
+                    cancel_ph.button("⏹ Cancel", key="cancel_bulk", on_click=cancel_bulk_job)
+                    chunks = iter_chunks(df, settings_res, sidebar_menu_type, action_mode, source_lang, target_name_col, target_desc_col, col_name_mapped, col_desc_mapped, int(val_workers), start=job['next'])
+                    try:
+                        for end, part, stats in chunks:
+                            job['parts'].append(part)
+                            job['stats'] = merge_run_stats(job['stats'], stats)
+                            job['next'], job['chunks'] = end, job['chunks'] + 1
+                            progress.progress(end / job['total'], text=progress_text(end - resumed_at, job['total'] - resumed_at, time.time() - t0, end, job['total']))
+                            # Checked between chunks; the finished ones stay in the job for Resume
+                            if job['cancelled']: break
+                    except ValueError as e:
+                        st.session_state.bulk_job = None
+                        st.error(str(e))
                     else:
-                        result_df = df.copy()
-                        
-                        if "Check" in action_mode:
-                            result_df['Status'] = 'Valid'; result_df['Error'] = ''; result_df['Action'] = ''
-                            for idx, row in result_df.iterrows():
-                                valid, mod_row, err, act, _ = validate_item(row, sidebar_menu_type, generic_words, forbidden_words, ad_words, desc_lib_df, safe_bacon, safe_curacao)
-                                if not valid:
-                                    result_df.at[idx, 'Status'] = 'Issue'
-                                    result_df.at[idx, 'Error'] = err
-                                    result_df.at[idx, 'Action'] = act
-
-                        if "Translate" in action_mode:
-                            if target_name_col not in result_df.columns: result_df[target_name_col] = ''
-                            if target_desc_col not in result_df.columns: result_df[target_desc_col] = ''
-                            result_df['Name Source'] = ''
-                            result_df['Desc Source'] = ''
-                            
-                            for idx, row in result_df.iterrows():
-                                t_name, src_n = translate_text_with_priority(row['Item Name'], term_dict, stripped_term_dict, source_lang)
-                                t_desc, src_d = translate_text_with_priority(row['Description'], term_dict, stripped_term_dict, source_lang)
-                                
-                                result_df.at[idx, target_name_col] = t_name
-                                result_df.at[idx, target_desc_col] = t_desc
-                                result_df.at[idx, 'Name Source'] = src_n
-                                result_df.at[idx, 'Desc Source'] = src_d
-                        
-                        display_df = result_df.copy()
-                        display_df.rename(columns={'Item Name': col_name_mapped, 'Description': col_desc_mapped}, inplace=True)
-                        all_sheets[current_sheet_name] = display_df
-                        st.session_state.processed_data = display_df
-                        st.session_state.all_sheets_data = all_sheets
-                        st.success("Done!")
-                finally:
-                    spin_ph.empty() 
-
-    if logo_base64: header_html = f"""<div class="header-wrapper"><img src="data:image/png;base64,{get_img_as_base64('logo.png')}" class="header-logo"/><div class="header-title"><span class="title-oct">OCT</span> <span class="title-val">VALIDATOR</span></div></div>"""
+                        if job['cancelled'] and job['next'] < job['total']: st.info(f"Cancelled at {job['next']:,} / {job['total']:,} rows. Resume continues from there.")
+                        else:
+                            # Joining the chunks copies the result once more; that copy is checked against the
+                            # memory budget up front, timed as its own stage, and the chunks are dropped right after
+                            with stage('assemble'):
+                                need_mb, rss = core.frames_mb(job['parts']), core.rss_mb()
+                                if rss is not None and rss + need_mb > core.MEMORY_BUDGET_MB:
+                                    st.warning(f"Joining the chunks needs about {need_mb:,.0f} MB more, which goes past the {core.MEMORY_BUDGET_MB:,.0f} MB memory budget.")
+                                display_df = pd.concat(job['parts']) if job['parts'] else process_frame(df, settings_res, sidebar_menu_type, action_mode, source_lang, target_name_col, target_desc_col, col_name_mapped, col_desc_mapped)[0]
+                                job['parts'] = []
+                            st.session_state.bulk_job = None
+                            st.session_state.processed_data = display_df
+                            st.session_state.processed_opts = {
+                                'sheet_type': sidebar_menu_type, 'action_mode': action_mode, 'source_lang': source_lang,
+                                'name_col': col_name_mapped, 'desc_col': col_desc_mapped,
+                                'target_name_col': target_name_col, 'target_desc_col': target_desc_col,
+                            }
+                            st.session_state.edit_note = None
+                            st.session_state.source_workbook = {
+                                'data': None if is_csv else upload_data, 'digest': upload_hash,
+                                'sheets': sheet_names, 'current': current_sheet_name,
+                            }
+                            st.session_state.processed_digest = result_digest(display_df, st.session_state.source_workbook)
+                            run_notes = format_run_notes(job['stats']) + [f"{job['chunks']} chunks"]
+                            if resumed_at: run_notes.append(f"resumed at row {resumed_at:,}")
+                            st.success("Done! " + " · ".join(run_notes))
+                    finally:
+                        chunks.close()
+                        cancel_ph.empty()
+                        progress.empty()
+                rep = report.to_dict()
+                done_rows = job['next'] - resumed_at
+                st.session_state.run_report = log_report(report, file=uploaded_file.name, sheet=current_sheet_name, mode=action_mode,
+                                                         rows=done_rows, rows_per_s=round(done_rows / rep['seconds']) if rep['seconds'] else None)
+
+        if st.session_state.get('run_report'): render_run_report(st.session_state.run_report)
+
+    if logo_base64: header_html = f"""<div class="header-wrapper"><img src="{logo_base64}" class="header-logo"/><div class="header-title"><span class="title-oct">OCT</span> <span class="title-val">VALIDATOR</span></div></div>"""
     else: header_html = """<div class="header-wrapper"><div style="font-size:4em;">🍊</div><div class="header-title">OCTVALIDATOR</div></div>"""
     st.markdown(header_html, unsafe_allow_html=True)
 
@@ -604,12 +423,11 @@ def main():
                 spin_html = f'<div class="loading-content"><img src="{logo_base64}" class="action-logo-spin"/><div class="loading-text">Checking...</div></div>'
                 spin_ph = st.empty()
                 spin_ph.markdown(f'<div id="action-overlay">{spin_html}</div>', unsafe_allow_html=True)
-                time.sleep(0.5) 
                 if not conn_status: st.error("Connection Error.")
                 elif not man_name: st.warning("Enter item name.")
                 else:
                     row = {'Item Name': man_name, 'Description': man_desc}
-                    valid, mod_row, err, act, suggestions = validate_item(row, manual_menu_type, generic_words, forbidden_words, ad_words, desc_lib_df, safe_bacon, safe_curacao)
+                    valid, mod_row, err, act, suggestions = validate_item(row, manual_menu_type, generic_words, forbidden_words, ad_words, suggestion_index, safe_bacon, safe_curacao)
                     spin_ph.empty()
                     if valid and not err: st.markdown(f"<div class='success-box' style='color:#111; background:#e8f5e9; padding:10px; border-radius:5px;'>✅ <b>Item is Valid</b></div>", unsafe_allow_html=True)
                     else:
@@ -634,12 +452,11 @@ def main():
                  spin_html = f'<img src="{logo_base64}" class="action-logo-spin"/>' if logo_base64 else '🍊'
                  spin_ph = st.empty()
                  spin_ph.markdown(f'<div id="action-overlay">{spin_html}</div>', unsafe_allow_html=True)
-                 time.sleep(0.5)
                  
                  src_lang_detect = "English"
                  if re.search(r'[\u0600-\u06FF]', termo_input): src_lang_detect = "Arabic"
                  
-                 res, src = search_token_wise_core(termo_input, term_dict, stripped_term_dict, allow_google, src_lang_detect) 
+                 res, src = search_token_wise_core(termo_input, term_dict, stripped_term_dict, allow_google, src_lang_detect, term_index) 
                  
                  spin_ph.empty()
                  # CLEAN RESULT DISPLAY
@@ -652,31 +469,56 @@ def main():
         # with st.expander("🔌 OCT-DATA", expanded=False): ...
         st.markdown('</div>', unsafe_allow_html=True)
 
+    batch = st.session_state.get('batch')
+    if batch:
+        st.markdown("---")
+        st.subheader("📦 Batch Results")
+        st.fragment(batch_panel, run_every=1.0 if st.session_state.get('batch_polling') else None)()
+        if batch.finished() and any(j['status'] == 'done' for j in batch.snapshot()):
+            st.download_button("📦 Download all (zip)", data=batch.zip_bytes, file_name="Processed_Menus.zip", mime="application/zip", key="batch_zip")
+
     if st.session_state.processed_data is not None:
         st.markdown("---")
         st.subheader("📊 Bulk Results")
-        def highlight_rows(row):
-            if 'Status' in row and row['Status'] == 'Issue': return ['background-color: #ffe6e6; color: black'] * len(row)
-            return ['color: black'] * len(row)
-        edited_df = st.data_editor(st.session_state.processed_data.style.apply(highlight_rows, axis=1), num_rows="fixed", use_container_width=True)
+        result_df = st.session_state.processed_data
+        source = st.session_state.get('source_workbook')
+        digest = st.session_state.get('processed_digest') or result_digest(result_df, source)
+
+        # Only the current page is styled and sent to the browser; filters come from the cached index
+        index = result_index(digest, result_df)
+        filter_cols = st.columns([1, 1.6, 1.2, 0.7])
+        selected = {}
+        for col, box in zip(RESULT_FILTERS, filter_cols):
+            if col in index:
+                # Values kept from an earlier result may no longer exist
+                if f"filter_{col}" in st.session_state: st.session_state[f"filter_{col}"] = [v for v in st.session_state[f"filter_{col}"] if v in index[col]]
+                with box: selected[col] = st.multiselect(col, list(index[col]), format_func=lambda v: v or "(blank)", key=f"filter_{col}")
+        with filter_cols[3]: page_size = st.selectbox("Rows per page", RESULT_PAGE_SIZES, index=1, key="page_size")
+        rows = filter_rows(index, len(result_df), selected)
+        pages = max(1, -(-len(rows) // page_size))
+        if st.session_state.get('result_page', 1) > pages: st.session_state.result_page = 1
+        page_col, info_col = st.columns([0.2, 0.8])
+        with page_col: page = st.number_input("Page", min_value=1, max_value=pages, step=1, key="result_page")
+        with info_col: st.caption(f"{len(rows):,} of {len(result_df):,} rows · page {page} of {pages}")
+        page_df = result_page(result_df, rows, page - 1, page_size)
+        edited_df = st.data_editor(page_df.style.apply(issue_styles, axis=None), num_rows="fixed", width="stretch")
+        # Edited rows are written back and re-checked on their own; the rerun redraws the grid from the result
+        changed = changed_rows(page_df, edited_df)
+        if len(changed) and conn_status and st.session_state.get('processed_opts'):
+            t0 = time.perf_counter()
+            stats = apply_edits(result_df, edited_df.loc[changed], settings_res, st.session_state.processed_opts)
+            st.session_state.processed_digest = edit_digest(digest, result_df, changed)
+            st.session_state.edit_note = f"Saved {stats['edited']} edited rows · re-checked {stats['rechecked']} · re-translated {stats['retranslated']} · {(time.perf_counter() - t0) * 1000:.0f} ms"
+            st.rerun()
+        if st.session_state.get('edit_note'): st.caption(st.session_state.edit_note)
         c1, c2, c3 = st.columns([1, 1, 1])
         with c2:
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                if 'all_sheets_data' in st.session_state:
-                    sheets_dict = st.session_state.all_sheets_data
-                    for s_name, s_df in sheets_dict.items():
-                        clean_df = s_df.copy()
-                        cols_to_remove = ['Status', 'Error', 'Action', 'Name Source', 'Desc Source']
-                        clean_df = clean_df.drop(columns=[c for c in cols_to_remove if c in clean_df.columns])
-                        clean_df.to_excel(writer, sheet_name=s_name, index=False)
-                else:
-                    clean_df = edited_df.data.copy() if hasattr(edited_df, "data") else edited_df.copy()
-                    cols_to_remove = ['Status', 'Error', 'Action', 'Name Source', 'Desc Source']
-                    clean_df = clean_df.drop(columns=[c for c in cols_to_remove if c in clean_df.columns])
-                    clean_df.to_excel(writer, index=False)
-            
-            st.download_button("📥 Download Excel", data=output.getvalue(), file_name="Processed_Menu.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            formats = [f for f in EXPORT_FORMATS if f != "Parquet" or parquet_available()]
+            export_fmt = st.selectbox("Export format", formats, key="export_fmt")
+            file_name, mime = EXPORT_FORMATS[export_fmt]
+            label = "📥 Download Excel" if export_fmt == "Excel (.xlsx)" else f"📥 Download {export_fmt}"
+            # Built on click (and cached by digest), so a rerun after an edit does not re-encode the workbook
+            st.download_button(label, data=lambda: export_bytes(digest, export_fmt, result_df, source), file_name=file_name, mime=mime)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,110 @@
+# -----------------------------------------------------------------------------
+# OCT VALIDATOR - APP LATENCY
+# Times the Streamlit script headlessly (streamlit.testing AppTest): the first run of a fresh
+# process, plain reruns and reruns with a processed menu on screen, plus a bare `import oct_core`.
+#   python benchmarks/app_latency.py --rows 500 --reruns 20 --out before.json
+# Settings come from the synthetic generator and machine translation goes to a stub backend.
+# -----------------------------------------------------------------------------
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [ROOT, BENCH_DIR]
+
+# Runs app.py as __main__ on every rerun, like `streamlit run` does
+SCRIPT = """
+import io, os, runpy, sys
+sys.path[:0] = [{root!r}, {bench!r}]
+os.chdir({root!r})
+import streamlit as st
+import oct_core as core
+from app_latency import bench_settings
+
+class Upload(io.BytesIO):
+    def __init__(self, path):
+        super().__init__(open(path, 'rb').read()); self.name = os.path.basename(path); self.file_id = path
+
+core.load_settings = lambda *a, **k: bench_settings({terms})
+core.google_translate = lambda prompt, tgt_lang: "[" + tgt_lang + "] " + prompt
+st.file_uploader = lambda *a, **k: Upload(os.environ['OCT_BENCH_UPLOAD']) if os.environ.get('OCT_BENCH_UPLOAD') else None
+runpy.run_path(os.path.join({root!r}, 'app.py'), run_name='__main__')
+"""
+
+def bench_settings(terms):
+    # Hashed sheets, so a second build in the same process comes from oct_core's compiled-sheet memo
+    import oct_core as core
+    from menu_gen import generate_settings_sheets
+    sheets = generate_settings_sheets(terms)
+    for key, sheet in sheets.items(): sheet['hash'] = f"bench-{terms}-{key}"
+    return core.build_settings(sheets)[0]
+
+def timed_run(at):
+    t0 = time.perf_counter()
+    at.run()
+    if at.exception: raise RuntimeError(at.exception[0].value)
+    return time.perf_counter() - t0
+
+def summary(times):
+    return {'runs': len(times), 'median_ms': round(statistics.median(times) * 1000, 1), 'min_ms': round(min(times) * 1000, 1)}
+
+def import_time():
+    # Fresh interpreter, so nothing is already in sys.modules
+    code = "import time; t0 = time.perf_counter(); import oct_core; print(time.perf_counter() - t0)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return round(float(out) * 1000, 1)
+
+def run(rows, terms, reruns, seed):
+    from streamlit.testing.v1 import AppTest
+    from menu_gen import generate_menu
+
+    tmp = tempfile.mkdtemp(prefix="oct_latency_")
+    os.environ.setdefault("OCT_TRANSLATION_CACHE", os.path.join(tmp, "tm.sqlite3"))
+    os.environ.setdefault("OCT_TRANSLATION_RATE", "0")
+    upload = os.path.join(tmp, "menu.csv")
+    generate_menu(rows, seed).to_csv(upload, index=False)
+
+    # Settings are compiled up front so the first run times the app, not the synthetic sheets
+    bench_settings(terms)
+    at = AppTest.from_string(SCRIPT.format(root=ROOT, bench=BENCH_DIR, terms=terms), default_timeout=600)
+    first = timed_run(at)
+    idle = [timed_run(at) for _ in range(reruns)]
+
+    os.environ['OCT_BENCH_UPLOAD'] = upload
+    timed_run(at)
+    at.sidebar.button(key="run_bulk").click()
+    process = timed_run(at)
+    results = [timed_run(at) for _ in range(reruns)]
+    return {
+        'first_run_ms': round(first * 1000, 1),
+        'import_oct_core_ms': import_time(),
+        'rerun_idle': summary(idle),
+        'rerun_with_results': summary(results),
+        'process_ms': round(process * 1000, 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time Streamlit reruns of the OCT validator app.")
+    parser.add_argument('--rows', type=int, default=500, help="rows in the processed menu kept on screen")
+    parser.add_argument('--terms', type=int, default=5000, help="terminology entries")
+    parser.add_argument('--reruns', type=int, default=20, help="timed reruns per case; the median is reported")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {'meta': {'rows': args.rows, 'terms': args.terms, 'reruns': args.reruns, 'cpus': os.cpu_count()},
+              'results': run(args.rows, args.terms, args.reruns, args.seed)}
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f: f.write(payload + "\n")
+    else: print(payload)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
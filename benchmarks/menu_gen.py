@@ -0,0 +1,141 @@
+# -----------------------------------------------------------------------------
+# SYNTHETIC MENUS & SETTINGS
+# Deterministic generator for benchmark inputs: English/Arabic menus with choice phrasing,
+# forbidden/generic/mismatch hits and duplicate rows, plus terminology sheets of any size.
+# Same seed, same output.
+# -----------------------------------------------------------------------------
+import itertools
+import random
+
+import pandas as pd
+
+# (English, Arabic) vocabulary; compound terminology entries are built from these
+ADJECTIVES = [
+    ("grilled", "مشوي"), ("fried", "مقلي"), ("spicy", "حار"), ("crispy", "مقرمش"), ("roasted", "محمص"),
+    ("smoked", "مدخن"), ("steamed", "مطهو على البخار"), ("baked", "مخبوز"), ("stuffed", "محشي"), ("creamy", "كريمي"),
+    ("classic", "كلاسيك"), ("mini", "صغير"), ("large", "كبير"), ("double", "دبل"), ("loaded", "محمل"),
+    ("hot", "ساخن"), ("iced", "مثلج"), ("fresh", "طازج"), ("sweet", "حلو"), ("sour", "حامض"),
+    ("garlic", "بالثوم"), ("lemon", "بالليمون"), ("honey", "بالعسل"), ("cheesy", "بالجبنة"), ("bbq", "باربكيو"),
+    ("tandoori", "تندوري"), ("shawarma style", "على طريقة الشاورما"), ("mexican", "مكسيكي"), ("italian", "إيطالي"), ("turkish", "تركي"),
+]
+PROTEINS = [
+    ("chicken", "دجاج"), ("beef", "لحم بقري"), ("lamb", "لحم غنم"), ("fish", "سمك"), ("shrimp", "روبيان"),
+    ("prawn", "قريدس"), ("salmon", "سلمون"), ("tuna", "تونة"), ("turkey", "ديك رومي"), ("veal", "لحم عجل"),
+    ("falafel", "فلافل"), ("halloumi", "حلومي"), ("mushroom", "فطر"), ("vegetable", "خضار"), ("egg", "بيض"),
+    ("kofta", "كفتة"), ("liver", "كبدة"), ("sausage", "نقانق"), ("crab", "سلطعون"), ("calamari", "كاليماري"),
+    ("paneer", "بانير"), ("tofu", "توفو"), ("duck", "بط"), ("quail", "سمان"), ("octopus", "أخطبوط"),
+]
+DISHES = [
+    ("burger", "برجر"), ("sandwich", "ساندويتش"), ("wrap", "راب"), ("pizza", "بيتزا"), ("pasta", "باستا"),
+    ("salad", "سلطة"), ("soup", "شوربة"), ("rice", "أرز"), ("platter", "طبق"), ("bowl", "بول"),
+    ("shawarma", "شاورما"), ("kabsa", "كبسة"), ("mandi", "مندي"), ("biryani", "برياني"), ("tacos", "تاكو"),
+    ("skewers", "أسياخ"), ("fatteh", "فتة"), ("manakeesh", "مناقيش"), ("sub", "صب"), ("noodles", "نودلز"),
+    ("curry", "كاري"), ("kebab", "كباب"), ("pie", "فطيرة"), ("roll", "رول"), ("nuggets", "ناجتس"),
+    ("steak", "ستيك"), ("fillet", "فيليه"), ("bites", "قطع"), ("sliders", "سلايدرز"), ("quesadilla", "كساديا"),
+]
+DRINKS = [
+    ("latte", "لاتيه"), ("mocha", "موكا"), ("espresso", "إسبريسو"), ("cappuccino", "كابتشينو"), ("frappe", "فرابيه"),
+    ("lemonade", "ليموناضة"), ("mojito", "موهيتو"), ("smoothie", "سموذي"), ("milkshake", "ميلك شيك"), ("tea", "شاي"),
+]
+SIDES = [
+    ("fries", "بطاطس"), ("coleslaw", "كول سلو"), ("hummus", "حمص"), ("garlic sauce", "صوص الثوم"), ("pickles", "مخلل"),
+    ("cheese", "جبنة"), ("lettuce", "خس"), ("tomato", "طماطم"), ("onion", "بصل"), ("bread", "خبز"),
+]
+FILLERS = ["delicious", "tasty", "fresh", "served with", "made with", "our", "signature", "special", "amazing", "famous"]
+FILLERS_AR = ["لذيذ", "طازج", "يقدم مع", "مع", "محضر من", "مميز"]
+CHOICE_PHRASES = ["choice of {a} or {b}", "choose {a} / {b}", "your choice of {a}, {b}", "{a} or {b}", "choice between {a} and {b}"]
+FORBIDDEN = ["bacon", "ham", "pork", "wine", "beer", "rum", "blue curacao", "pepperoni"]
+GENERIC = ["special dish", "combo", "meal", "family pack", "offer", "box"]
+AD_WORDS = ["order now", "free delivery", "best seller", "limited offer"]
+
+def _pick(rng, pairs, arabic):
+    return rng.choice(pairs)[1 if arabic else 0]
+
+def _name(rng, arabic):
+    kind = rng.random()
+    if kind < .12: words = [_pick(rng, ADJECTIVES, arabic), _pick(rng, DRINKS, arabic)]
+    elif kind < .55: words = [_pick(rng, ADJECTIVES, arabic), _pick(rng, PROTEINS, arabic), _pick(rng, DISHES, arabic)]
+    else: words = [_pick(rng, PROTEINS, arabic), _pick(rng, DISHES, arabic)]
+    if arabic: words = words[::-1]
+    name = " ".join(words)
+    r = rng.random()
+    if r < .04: name += " " + rng.choice(FORBIDDEN)
+    elif r < .08: name += " " + rng.choice(GENERIC)
+    elif r < .11: name += " or " + _pick(rng, PROTEINS, arabic)
+    return name if arabic or rng.random() < .6 else name.title()
+
+def _description(rng, name, arabic):
+    r = rng.random()
+    if r < .08: return name
+    if r < .14: return ""
+    if r < .22:
+        return rng.choice(CHOICE_PHRASES).format(a=_pick(rng, PROTEINS, False), b=_pick(rng, PROTEINS, False))
+    if r < .28: return name + " " + rng.choice(FILLERS)
+    words = [_pick(rng, SIDES + PROTEINS + ADJECTIVES, arabic) for _ in range(rng.randint(2, 7))]
+    fillers = FILLERS_AR if arabic else FILLERS
+    for _ in range(rng.randint(0, 2)): words.insert(rng.randint(0, len(words)), rng.choice(fillers))
+    if rng.random() < .05: words.append(rng.choice(FORBIDDEN))
+    if rng.random() < .04: words.append(rng.choice(AD_WORDS))
+    return " ".join(words)
+
+def generate_menu(rows, seed=0, arabic_share=0.3, duplicate_share=0.25):
+    # DataFrame with 'Item Name', 'Description' and 'Price'. About duplicate_share of the rows
+    # repeat an earlier item, as chain menus do across branches and sections.
+    rng = random.Random(seed)
+    out = []
+    for _ in range(rows):
+        if out and rng.random() < duplicate_share:
+            out.append(dict(rng.choice(out)))
+            continue
+        arabic = rng.random() < arabic_share
+        name = _name(rng, arabic)
+        out.append({'Item Name': name, 'Description': _description(rng, name.lower(), arabic), 'Price': round(rng.uniform(5, 120), 1)})
+    return pd.DataFrame(out, columns=['Item Name', 'Description', 'Price'])
+
+def _shuffled(rng, combos):
+    combos = list(combos)
+    rng.shuffle(combos)
+    return combos
+
+def generate_terminology(terms, seed=0):
+    # Terminology sheet rows (header + `terms` English/Arabic pairs): single words, then two- and
+    # three-word compounds, then "... with <side>" entries, each group in a seeded order.
+    # Up to ~250k distinct entries.
+    rng = random.Random(seed)
+    groups = [
+        lambda: [(w,) for w in ADJECTIVES + PROTEINS + DISHES + DRINKS + SIDES],
+        lambda: _shuffled(rng, list(itertools.product(PROTEINS, DISHES)) + list(itertools.product(ADJECTIVES, DRINKS + SIDES))),
+        lambda: _shuffled(rng, itertools.product(ADJECTIVES, PROTEINS, DISHES)),
+        lambda: _shuffled(rng, itertools.product(ADJECTIVES, PROTEINS, DISHES, SIDES)),
+    ]
+    rows = [["English", "Arabic"]]
+    seen = set()
+    for group in groups:
+        for combo in group():
+            if len(rows) > terms: return rows
+            if len(combo) == 4:
+                en = " ".join(w[0] for w in combo[:3]) + " with " + combo[3][0]
+                ar = " ".join(w[1] for w in reversed(combo[:3])) + " مع " + combo[3][1]
+            else:
+                en = " ".join(w[0] for w in combo)
+                ar = " ".join(w[1] for w in reversed(combo))
+            if en in seen: continue
+            seen.add(en)
+            rows.append([en, ar])
+    return rows
+
+def generate_settings_sheets(terms=5000, seed=0):
+    # Raw settings sheets in the shape oct_core.build_settings() takes
+    def words(values, header=False): return ([["Word"]] if header else []) + [[w] for w in values]
+    rows = {
+        'generic': words(GENERIC),
+        'ad': words(AD_WORDS),
+        'forbidden': words(FORBIDDEN, header=True),
+        'safe_bacon': words(["beef", "turkey", "veal", "halal", "chicken"]),
+        'safe_curacao': words(["syrup", "flavor", "mocktail", "virgin"]),
+        'terminology': generate_terminology(terms, seed),
+        'desc_lib': [["Item Name", "Eng Desc", "Arb Desc"]] + [
+            [f"{p[0]} {d[0]}".title(), f"{p[0]} {d[0]} served with {s[0]}", f"{d[1]} {p[1]} يقدم مع {s[1]}"]
+            for p, d, s in itertools.islice(itertools.product(PROTEINS, DISHES, SIDES), 500)],
+    }
+    return {key: {'title': key, 'rows': r, 'hash': None} for key, r in rows.items()}
@@ -0,0 +1,121 @@
+# -----------------------------------------------------------------------------
+# OCT VALIDATOR - BENCHMARKS
+# Times the hot paths of oct_core on synthetic menus and prints JSON results:
+#   python benchmarks/run_bench.py --sizes 1000,10000 --out before.json
+#   python benchmarks/run_bench.py --compare before.json after.json
+# Machine translation goes to a stub backend and a throwaway translation memory.
+# -----------------------------------------------------------------------------
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OCT_TRANSLATION_RATE", "0")
+TMP_DIR = tempfile.mkdtemp(prefix="oct_bench_")
+atexit.register(shutil.rmtree, TMP_DIR, True)
+
+import oct_core as core
+from menu_gen import generate_menu, generate_settings_sheets
+
+def stub_translate(prompt, tgt_lang):
+    return f"[{tgt_lang}] {prompt}"
+
+def reset_state(tag):
+    # Every timing starts from an empty translation memory and normalizer memo so repeats do the same work
+    core._shared['translation_cache'] = core.TranslationCache(os.path.join(TMP_DIR, f"{tag}.sqlite3"))
+    core._normalize_str.cache_clear()
+
+# Each bench takes (records, settings, df) for one generated menu
+def bench_normalize_text(records, s, df):
+    for r in records: core.normalize_text(r['Item Name']); core.normalize_text(r['Description'])
+
+def bench_check_mismatch(records, s, df):
+    for r in records: core.check_mismatch(r['Item Name'].lower(), r['Description'].lower())
+
+def bench_validate_item(records, s, df):
+    for r in records: core.validate_item(r, "Main Menu", s[2], s[3], s[4], s.suggestion_index, s[8], s[9])
+
+def bench_validate_frame(records, s, df):
+    core.validate_frame(df, "Main Menu", core.build_ruleset(s[2], s[3], s[4], s[7], s[8], s[9]))
+
+def bench_translate_text_with_priority(records, s, df):
+    for r in records: core.translate_text_with_priority(r['Item Name'], s[5], s[6], "English", s[11], backend=stub_translate)
+
+def bench_translate_texts(records, s, df):
+    core.translate_texts(df['Item Name'].tolist() + df['Description'].tolist(), s[5], s[6], "English", s[11], backend=stub_translate)
+
+def bench_search_token_wise_core(records, s, df):
+    for r in records: core.search_token_wise_core(r['Item Name'], s[5], s[6], False, "English", s[10])
+
+BENCHES = {name[len('bench_'):]: fn for name, fn in list(globals().items()) if name.startswith('bench_')}
+
+def git_commit():
+    try: return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception: return None
+
+def run(sizes, terms, benches, repeat, seed):
+    settings, _ = core.build_settings(generate_settings_sheets(terms, seed))
+    results = []
+    for rows in sizes:
+        df = generate_menu(rows, seed)
+        records = df.to_dict('records')
+        for name in benches:
+            times = []
+            for _ in range(repeat):
+                reset_state(f"{name}_{rows}_{len(times)}")
+                t0 = time.perf_counter()
+                BENCHES[name](records, settings, df)
+                times.append(time.perf_counter() - t0)
+            best = min(times)
+            results.append({'bench': name, 'rows': rows, 'terms': terms, 'seconds': round(best, 6),
+                            'us_per_row': round(best / rows * 1e6, 3), 'rows_per_s': round(rows / best) if best else None})
+            print(f"{name:<30} {rows:>7} rows  {best:9.3f}s  {best / rows * 1e6:10.1f} us/row", file=sys.stderr)
+    return results
+
+def compare(old_path, new_path):
+    with open(old_path) as f: old = {(r['bench'], r['rows']): r for r in json.load(f)['results']}
+    with open(new_path) as f: new = json.load(f)['results']
+    print(f"{'bench':<30} {'rows':>7} {'old s':>10} {'new s':>10} {'speedup':>8}")
+    for r in new:
+        o = old.get((r['bench'], r['rows']))
+        if not o: continue
+        print(f"{r['bench']:<30} {r['rows']:>7} {o['seconds']:>10.3f} {r['seconds']:>10.3f} {o['seconds'] / r['seconds'] if r['seconds'] else float('inf'):>7.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the OCT validator core on synthetic menus.")
+    parser.add_argument('--sizes', default="1000,10000,100000", help="comma-separated menu row counts")
+    parser.add_argument('--terms', type=int, default=5000, help="terminology entries (1k-50k)")
+    parser.add_argument('--bench', action='append', choices=sorted(BENCHES), help="run only these (repeatable)")
+    parser.add_argument('--repeat', type=int, default=1, help="timings per case; the best is reported")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="write the JSON here instead of stdout")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="print speedups between two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    report = {
+        'meta': {'commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(),
+                 'cpus': os.cpu_count(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'seed': args.seed,
+                 'terms': args.terms, 'repeat': args.repeat},
+        'results': run(sizes, args.terms, args.bench or list(BENCHES), max(1, args.repeat), args.seed),
+    }
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f: f.write(payload + "\n")
+    else: print(payload)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# -----------------------------------------------------------------------------
+# OCT VALIDATOR - BATCH COMMAND LINE
+# Validates and/or translates CSV/XLSX menus without the Streamlit UI:
+#   python oct_cli.py menus/ --mode both --out processed/ --jobs 4
+# -----------------------------------------------------------------------------
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import oct_core as core
+
+MENU_EXTENSIONS = ('.csv', '.xlsx')
+MODES = {'check': "Check Errors Only", 'translate': "Translate Only", 'both': "Check & Translate"}
+
+def find_menus(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(MENU_EXTENSIONS) and not name.startswith('~$'): files.append(os.path.join(path, name))
+        else: files.append(path)
+    return files
+
+def output_path(path, out_dir):
+    return os.path.join(out_dir or os.path.dirname(path) or '.', core.processed_name(path))
+
+# Settings are loaded once in the parent and shipped to each worker process by the initializer.
+_settings = None
+
+def _init_worker(settings):
+    global _settings
+    _settings = settings
+
+def process_file(path, opts):
+    t0 = time.time()
+    with core.run_report(path) as report:
+        with open(path, 'rb') as f: data = f.read()
+        payload, result_df, run_notes = core.process_workbook(data, path, _settings, opts)
+        out = output_path(path, opts['out'])
+        with open(out, 'wb') as f: f.write(payload)
+
+    issues = int((result_df['Status'] == 'Issue').sum()) if 'Status' in result_df.columns else 0
+    mem = report.memory()
+    if mem: run_notes = run_notes + [f"peak {mem['peak_mb']:.0f} MB" + (f" (over the {mem['budget_mb']:.0f} MB budget)" if mem['over_budget'] else "")]
+    return out, run_notes, issues, time.time() - t0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and translate menu files (CSV/XLSX) with the OCT rules.")
+    parser.add_argument('paths', nargs='+', help="menu files or directories of .csv/.xlsx files")
+    parser.add_argument('--mode', choices=sorted(MODES), default='check')
+    parser.add_argument('--sheet-type', choices=["Main Menu", "Sep Sheet"], default="Main Menu")
+    parser.add_argument('--source-lang', choices=["English", "Arabic"], default="English")
+    parser.add_argument('--sheet', help="worksheet to process in .xlsx files (default: the first one; ignored for .csv)")
+    parser.add_argument('--name-col', help="item name column (default: guessed from the header)")
+    parser.add_argument('--desc-col', help="description column (default: guessed from the header)")
+    parser.add_argument('--out', help="output directory (default: next to each input)")
+    parser.add_argument('--keyfile', default=core.SETTINGS_KEYFILE, help="Google service account JSON")
+    parser.add_argument('--jobs', type=int, default=1, help="files processed in parallel (separate processes)")
+    parser.add_argument('--workers', type=int, default=core.VALIDATION_WORKERS, help="processes validating each file (with --jobs 1)")
+    args = parser.parse_args(argv)
+
+    files = find_menus(args.paths)
+    if not files:
+        print("No .csv/.xlsx files found.", file=sys.stderr)
+        return 1
+
+    settings = core.load_settings(keyfile=args.keyfile)
+    if settings[0] == False:
+        print("Settings unavailable: no service account credentials and no settings snapshot", file=sys.stderr)
+        return 2
+    if args.out: os.makedirs(args.out, exist_ok=True)
+
+    opts = {'sheet': args.sheet, 'name_col': args.name_col, 'desc_col': args.desc_col, 'out': args.out,
+            'sheet_type': args.sheet_type, 'action_mode': MODES[args.mode], 'source_lang': args.source_lang,
+            'workers': args.workers if args.jobs <= 1 else 1}
+    failed = 0
+    t0 = time.time()
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker, initargs=(settings,)) as pool:
+            futures = [(path, pool.submit(process_file, path, opts)) for path in files]
+            results = []
+            for path, fut in futures:
+                try: results.append((path, fut.result(), None))
+                except Exception as e: results.append((path, None, e))
+    else:
+        _init_worker(settings)
+        results = []
+        for path in files:
+            try: results.append((path, process_file(path, opts), None))
+            except Exception as e: results.append((path, None, e))
+
+    for path, res, err in results:
+        if err is not None:
+            failed += 1
+            print(f"FAILED {path}: {err}", file=sys.stderr)
+            continue
+        out, run_notes, issues, secs = res
+        print(f"{path} -> {out}: {' · '.join(run_notes)} · {issues} issues · {secs:.1f}s")
+    print(f"{len(files) - failed}/{len(files)} files in {time.time() - t0:.1f}s")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
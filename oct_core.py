@@ -0,0 +1,1488 @@
+# -----------------------------------------------------------------------------
+# OCT VALIDATOR - CORE LOGIC
+# Validation, terminology and translation engine shared by the Streamlit app (app.py)
+# and the batch command line (oct_cli.py). Nothing here imports Streamlit.
+# -----------------------------------------------------------------------------
+import pandas as pd
+import numpy as np
+import re
+from thefuzz import fuzz
+from thefuzz import utils as fuzz_utils
+from rapidfuzz import process as rf_process, fuzz as rf_fuzz
+from io import BytesIO
+import os
+import sys
+import time
+import unicodedata
+import sqlite3
+import threading
+import weakref
+import zipfile
+import hashlib
+import json
+import logging
+import multiprocessing
+import contextvars
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+
+# --- RUN INSTRUMENTATION ---
+# A RunReport collects stage wall times, validation rule times and counters for one bulk run.
+# It is bound to the current context, so instrumented code records into it without it being
+# passed around; with no report bound, recording is a no-op.
+logger = logging.getLogger("oct")
+_run_report = contextvars.ContextVar("oct_run_report", default=None)
+
+# --- MEMORY ---
+# A run's peak is the kernel's resident high-water mark (ru_maxrss) when the run raised it, so
+# spikes between samples are not missed. ru_maxrss never goes down, so a run that stays below an
+# earlier, larger one uses current RSS (/proc/self/statm) sampled at every stage boundary instead.
+# RSS is process-wide: runs that overlap (batch jobs) see each other's memory.
+MEMORY_BUDGET_MB = float(os.environ.get("OCT_MEMORY_BUDGET_MB", "1024"))
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f: return int(f.read().split()[1]) * _PAGE_SIZE / 2**20
+    except: return None
+
+def frames_mb(frames):
+    # Shallow in-memory size of some frames, e.g. what concatenating them will allocate
+    return sum(int(f.memory_usage(index=True, deep=False).sum()) for f in frames) / 2**20
+
+def max_rss_mb():
+    # ru_maxrss is in KiB on Linux and in bytes on macOS; None where `resource` is missing (Windows)
+    try: import resource
+    except ImportError: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+class RunReport:
+    def __init__(self, label=None):
+        self.label = label
+        self.stages, self.rules, self.counters = {}, {}, {}
+        self._lock = threading.Lock()
+        self.rss_start = self.rss_peak = rss_mb()
+        self.hwm_start = self.hwm = max_rss_mb()
+
+    def sample_memory(self):
+        rss, hwm = rss_mb(), max_rss_mb()
+        with self._lock:
+            if rss is not None: self.rss_peak = max(self.rss_peak or 0, rss)
+            if hwm is not None: self.hwm = max(self.hwm or 0, hwm)
+
+    def add(self, bucket, name, value):
+        with self._lock: bucket[name] = bucket.get(name, 0) + value
+
+    def lap(self, rule, t0):
+        # Charges the time since t0 to a validation rule and returns the new start time
+        now = time.perf_counter()
+        self.add(self.rules, rule, now - t0)
+        return now
+
+    def merge_rules(self, rules):
+        for name, secs in rules.items(): self.add(self.rules, name, secs)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'label': self.label,
+                # Dotted stages ('translate.mt') are parts of their parent and not added twice
+                'seconds': round(sum(v for k, v in self.stages.items() if '.' not in k), 4),
+                'stages': {k: round(v, 4) for k, v in self.stages.items()},
+                'rules': {k: round(v, 4) for k, v in sorted(self.rules.items(), key=lambda kv: -kv[1])},
+                'counters': dict(sorted(self.counters.items())),
+                'memory': self.memory(),
+            }
+
+    def memory(self):
+        # This run's peak RSS (MB) against OCT_MEMORY_BUDGET_MB; 'run_mb' is the growth over its start
+        raised = self.hwm is not None and self.hwm_start is not None and self.hwm > self.hwm_start
+        peak = self.hwm if raised else self.rss_peak
+        if peak is None: return None
+        grown = peak - self.rss_start if self.rss_start is not None else None
+        return {'peak_mb': round(peak, 1), 'run_mb': round(max(grown, 0), 1) if grown is not None else None,
+                'budget_mb': MEMORY_BUDGET_MB, 'over_budget': peak > MEMORY_BUDGET_MB}
+
+def current_report():
+    return _run_report.get()
+
+@contextmanager
+def run_report(label=None):
+    report = RunReport(label)
+    token = _run_report.set(report)
+    try: yield report
+    finally:
+        report.sample_memory()
+        _run_report.reset(token)
+
+@contextmanager
+def stage(name):
+    report = _run_report.get()
+    t0 = time.perf_counter()
+    if report: report.sample_memory()
+    try: yield
+    finally:
+        if report:
+            report.add(report.stages, name, time.perf_counter() - t0)
+            report.sample_memory()
+
+def count(name, n=1):
+    report = _run_report.get()
+    if report: report.add(report.counters, name, n)
+
+def log_report(report, **extra):
+    # One JSON line per run on the "oct" logger, for throughput tracking
+    data = report.to_dict()
+    data.update(extra)
+    logger.info(json.dumps({'event': 'bulk_run', **data}, ensure_ascii=False, default=str))
+    return data
+
+# --- TEXT NORMALIZATION ---
+# NFKC + lower-case, then one translate() pass drops Arabic diacritics/tatweel and folds
+# alef/taa marbuta/alef maqsura, one regex blanks punctuation and split/join collapses
+# whitespace. Results are memoized because menus repeat the same strings constantly.
+NORMALIZE_MEMO_SIZE = 65536
+_ARABIC_FOLD = {c: None for c in range(0x064B, 0x0660)}
+_ARABIC_FOLD[0x0640] = None
+_ARABIC_FOLD.update({ord(c): 'ا' for c in "إأآ"})
+_ARABIC_FOLD.update({ord('ة'): 'ه', ord('ى'): 'ي'})
+_PUNCT_RE = re.compile(r'[^\w\s\u0600-\u06FF]')
+
+@lru_cache(maxsize=NORMALIZE_MEMO_SIZE)
+def _normalize_str(text):
+    text = unicodedata.normalize('NFKC', text).lower().translate(_ARABIC_FOLD)
+    return ' '.join(_PUNCT_RE.sub(' ', text).split())
+
+def normalize_text(text):
+    if not isinstance(text, str): return str(text)
+    return _normalize_str(text)
+
+def strip_text(text):
+    if not isinstance(text, str): return str(text)
+    return _normalize_str(text).replace(' ', '')
+
+# --- MULTI-PATTERN MATCHER ---
+# Patterns are indexed by their first MATCH_HEAD characters, so one pass over a text
+# finds every pattern occurrence with a handful of dict lookups per position.
+MATCH_HEAD = 3
+DEFAULT_FORBIDDEN = ['pig', 'ham', 'naughty', 'dirty', 'fucking']
+
+def compile_matcher(patterns, words=None):
+    ranks = {}
+    for i, pat in enumerate(patterns):
+        if pat and pat not in ranks: ranks[pat] = i
+    heads = {}
+    for pat in ranks:
+        heads.setdefault(pat[:MATCH_HEAD], set()).add(len(pat))
+    return {
+        'words': tuple(words if words is not None else patterns),
+        'ranks': ranks,
+        'heads': {h: tuple(sorted(lens, reverse=True)) for h, lens in heads.items()},
+        'head_lens': tuple(sorted({len(h) for h in heads}, reverse=True)),
+    }
+
+def build_word_matcher(words):
+    return compile_matcher([normalize_text(w) for w in words], words)
+
+def iter_matches(matcher, text):
+    ranks, heads, head_lens = matcher['ranks'], matcher['heads'], matcher['head_lens']
+    n = len(text)
+    for i in range(n):
+        for hl in head_lens:
+            lens = heads.get(text[i:i + hl])
+            if not lens: continue
+            for ln in lens:
+                if i + ln > n: continue
+                rank = ranks.get(text[i:i + ln])
+                if rank is not None: yield i, ln, rank
+
+def match_ranks(matcher, text):
+    if not matcher['ranks'] or not text: return set()
+    return {rank for _, _, rank in iter_matches(matcher, text)}
+
+# --- TERMINOLOGY TOKEN INDEX ---
+# Every distinct token of every terminology key, in dict order, with the value of the first
+# key it appears in. Scoring the whole vocabulary in one batched call gives the same winner
+# as walking term_dict token by token.
+def build_token_index(term_dict):
+    tokens, vals, seen = [], [], set()
+    for key, val in term_dict.items():
+        for token in key.split():
+            if token in seen: continue
+            seen.add(token)
+            tokens.append(sys.intern(token))
+            vals.append(val)
+    return {'tokens': tuple(tokens), 'vals': tuple(vals)}
+
+def fuzzy_token_lookup(norm_input, token_index):
+    # Returns (value, score) of the first token scoring >= 90, else of the first best-scoring token
+    if not token_index['tokens']: return None, 0
+    scores = rf_process.cdist([norm_input], token_index['tokens'], scorer=rf_fuzz.ratio, dtype=np.float64)[0]
+    scores = np.rint(scores)  # same half-to-even rounding as fuzz.ratio
+    hits = np.flatnonzero(scores >= 90)
+    best = hits[0] if hits.size else int(np.argmax(scores))
+    if scores[best] <= 0: return None, 0
+    return token_index['vals'][best], int(scores[best])
+
+# --- TERMINOLOGY MATCHER ---
+# Keys of 3+ chars ranked longest first (ties keep dict order), i.e. the order the squeeze
+# step has always replaced them in.
+def build_term_matcher(term_dict):
+    keys = sorted((k for k in term_dict if len(k) >= 3), key=len, reverse=True)
+    return compile_matcher(keys)
+
+def select_term_spans(term_matcher, text):
+    # Longest-first, non-overlapping term occurrences as (start, end, key), in text order
+    found = sorted(((rank, start, ln) for start, ln, rank in iter_matches(term_matcher, text)))
+    taken = bytearray(len(text))
+    spans = []
+    for rank, start, ln in found:
+        if any(taken[start:start + ln]): continue
+        taken[start:start + ln] = b'\x01' * ln
+        spans.append((start, start + ln, term_matcher['words'][rank]))
+    spans.sort()
+    return spans
+
+# --- DESCRIPTION LIBRARY SUGGESTIONS ---
+# Library names are pre-processed the way thefuzz's extractOne would process them on every
+# call, and each name's suggestion strings are formatted once. The index is never written after
+# it is built (it is shared through Settings); lookups are memoized per process, keyed by the
+# item name and the library's choices.
+SUGGESTION_MEMO_SIZE = 10000
+
+def build_suggestion_index(desc_lib_df):
+    index = {'names': (), 'choices': (), 'suggestions': {}}
+    if desc_lib_df.empty: return index
+    index['names'] = tuple(desc_lib_df['Item Name'].astype(str).unique())
+    index['choices'] = tuple(fuzz_utils.full_process(n, force_ascii=True) for n in index['names'])
+    suggestions = {}
+    for name, eng, arb in zip(desc_lib_df['Item Name'], desc_lib_df['Eng Desc'], desc_lib_df['Arb Desc']):
+        suggestions.setdefault(name, []).append(f"🇬🇧 {eng}\n\n🇸🇦 {arb}")
+    index['suggestions'] = {name: tuple(found) for name, found in suggestions.items()}
+    return index
+
+# Indexes built for callers that pass the library DataFrame itself, one per live DataFrame
+_suggestion_indexes = {}
+
+def suggestion_index_for(desc_lib_df):
+    # The prebuilt index as is; a library DataFrame is indexed once and reused while it is alive
+    if isinstance(desc_lib_df, dict): return desc_lib_df
+    hit = _suggestion_indexes.get(id(desc_lib_df))
+    if hit and hit[0]() is desc_lib_df: return hit[1]
+    index = build_suggestion_index(desc_lib_df)
+    key = id(desc_lib_df)
+    _suggestion_indexes[key] = (weakref.ref(desc_lib_df, lambda _: _suggestion_indexes.pop(key, None)), index)
+    return index
+
+@lru_cache(maxsize=SUGGESTION_MEMO_SIZE)
+def _library_match(itm_name, choices):
+    # Position of the best library name scoring 90+, or None
+    match = rf_process.extractOne(fuzz_utils.full_process(itm_name), choices, scorer=rf_fuzz.token_sort_ratio, processor=None)
+    return match[2] if match and int(round(match[1])) >= 90 else None
+
+def suggest_descriptions(itm_name, suggestion_index):
+    if not suggestion_index['names']: return ()
+    pos = _library_match(itm_name, suggestion_index['choices'])
+    return () if pos is None else suggestion_index['suggestions'].get(suggestion_index['names'][pos], ())
+
+# --- SETTINGS (Google Sheets) ---
+# Settings is a tuple of compiled tables plus a content version. One instance is shared read-only by
+# every session and worker thread, so it is built compact: interned strings, tuples and frozensets,
+# and the terminology kept as parallel En/Ar columns rather than one dict per row.
+Settings = namedtuple('Settings', ['ok', 'debug_table', 'generic_words', 'forbidden_words', 'ad_words', 'term_dict',
+                                   'stripped_term_dict', 'desc_lib_df', 'safe_bacon', 'safe_curacao', 'term_index',
+                                   'term_matcher', 'suggestion_index', 'version'], defaults=(None,))
+SETTINGS_KEYFILE = "service_account.json"
+SETTINGS_ID = "15YTSsTS7xspjzyfRWI9vVdiKAMxY125sGinpF4NeTD0"
+SETTINGS_SNAPSHOT_PATH = os.environ.get("OCT_SETTINGS_SNAPSHOT", os.path.join(".oct_cache", "settings_snapshot.json"))
+SETTINGS_SNAPSHOT_VERSION = 1
+# Settings sheet -> accepted worksheet titles (case-insensitive, first match wins)
+SETTINGS_SHEETS = {
+    'generic': ["Generic_Words", "Generic"],
+    'ad': ["Ad_Words", "Ads"],
+    'forbidden': ["Forbidden_Words", "Forbidden"],
+    'safe_bacon': ["Safe_Bacon", "Safe Bacon"],
+    'safe_curacao': ["Safe_Curacao", "Safe Curacao"],
+    'terminology': ["Terminology"],
+    'desc_lib': ["Description_Library"],
+}
+# Last load, for the UI: origin is 'sheets' (fetched), 'unchanged' (revision matched the
+# snapshot) or 'snapshot' (Google unreachable); recompiled lists the sheets rebuilt.
+settings_status = {'origin': None, 'revision': None, 'fetched_at': None, 'recompiled': []}
+
+def empty_settings():
+    return Settings(False, {'En': (), 'Ar': ()}, (), (), frozenset(), {}, {}, pd.DataFrame(), (), (),
+                    build_token_index({}), build_term_matcher({}), build_suggestion_index(pd.DataFrame()))
+
+def settings_client(creds_info=None, keyfile=SETTINGS_KEYFILE):
+    # Service account from the keyfile first, then from a credentials dict (the app's secrets).
+    # The Google client libraries are imported here so only a settings refresh pays for them.
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+    creds = None
+    try: creds = ServiceAccountCredentials.from_json_keyfile_name(keyfile, scope)
+    except:
+        try: creds = ServiceAccountCredentials.from_json_keyfile_dict(dict(creds_info), scope)
+        except: pass
+    return gspread.authorize(creds) if creds else None
+
+def fetch_settings_sheets(sh):
+    # One worksheet listing and one batchGet for every settings sheet. Rows are padded like
+    # get_all_values() so the parsers see the same shapes.
+    from gspread.utils import fill_gaps
+    titles = {}
+    for ws in sh.worksheets(): titles.setdefault(ws.title.strip().lower(), ws.title)
+    found = {}
+    for key, names in SETTINGS_SHEETS.items():
+        for name in names:
+            if name.strip().lower() in titles:
+                found[key] = titles[name.strip().lower()]
+                break
+    keys = list(found)
+    ranges = ["'" + found[k].replace("'", "''") + "'" for k in keys]
+    value_ranges = sh.values_batch_get(ranges).get('valueRanges', []) if ranges else []
+    sheets = {key: {'title': None, 'rows': []} for key in SETTINGS_SHEETS}
+    for key, vr in zip(keys, value_ranges):
+        sheets[key] = {'title': found[key], 'rows': fill_gaps(vr.get('values', []))}
+    for sheet in sheets.values(): sheet['hash'] = sheet_hash(sheet['rows'])
+    return sheets
+
+def sheet_hash(rows):
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode()).hexdigest()
+
+def _word_cells(rows, skip_row=False):
+    if not rows: return []
+    data = rows[1:] if skip_row and len(rows) > 1 else rows
+    return [str(cell).strip().lower() for row in data for cell in row if str(cell).strip()]
+
+def _compile_terminology(rows):
+    term_dict = {}
+    stripped_term_dict = {}
+    en, ar = [], []
+    if len(rows) > 1:
+        # Column A = English, Column B = Arabic
+        for r in rows[1:]:
+            if len(r) >= 2:
+                src, tgt = str(r[0]), str(r[1])
+                if src.strip() and tgt.strip():
+                    n_src = sys.intern(normalize_text(src))
+                    n_tgt = sys.intern(normalize_text(tgt))
+                    s_src = sys.intern(n_src.replace(' ', ''))
+                    s_tgt = sys.intern(n_tgt.replace(' ', ''))
+                    src_out, tgt_out = sys.intern(src.strip()), sys.intern(tgt.strip())
+
+                    term_dict[n_src] = tgt_out
+                    term_dict[n_tgt] = src_out
+                    stripped_term_dict[s_src] = tgt_out
+                    stripped_term_dict[s_tgt] = src_out
+
+                    en.append(sys.intern(src))
+                    ar.append(sys.intern(tgt))
+    debug_table = {'En': tuple(en), 'Ar': tuple(ar)}
+    return term_dict, stripped_term_dict, debug_table, build_token_index(term_dict), build_term_matcher(term_dict)
+
+def _compile_desc_lib(rows):
+    desc_lib_df = pd.DataFrame(columns=['Item Name', 'Eng Desc', 'Arb Desc'])
+    clean_lib = []
+    if len(rows) > 1:
+        for r in rows[1:]:
+            if len(r) >= 3: clean_lib.append([r[0].strip(), r[1].strip(), r[2].strip()])
+            elif len(r) == 2: clean_lib.append([r[0].strip(), r[1].strip(), ""])
+    if clean_lib:
+        desc_lib_df = pd.DataFrame(clean_lib, columns=['Item Name', 'Eng Desc', 'Arb Desc'])
+    return desc_lib_df, build_suggestion_index(desc_lib_df)
+
+def compile_settings_sheet(key, rows):
+    if key == 'generic': return build_word_matcher(_word_cells(rows))
+    if key == 'ad': return frozenset([normalize_text(w) for w in _word_cells(rows)])
+    if key == 'forbidden': return build_word_matcher(_word_cells(rows, True) + DEFAULT_FORBIDDEN)
+    if key == 'terminology': return _compile_terminology(rows)
+    if key == 'desc_lib': return _compile_desc_lib(rows)
+    return tuple(_word_cells(rows))
+
+# Compiled sheets by content hash, so a refresh only rebuilds the sheets that changed
+_compiled_sheets = {}
+
+def build_settings(sheets):
+    # The version is a digest of the sheet contents: the same sheets always give the same version
+    parts, recompiled, hashes = {}, [], []
+    for key in SETTINGS_SHEETS:
+        sheet = sheets.get(key) or {'rows': [], 'hash': None}
+        hashes.append(sheet['hash'] or sheet_hash(sheet['rows']))
+        hit = _compiled_sheets.get(key)
+        if hit and sheet['hash'] is not None and hit[0] == sheet['hash']: parts[key] = hit[1]
+        else:
+            parts[key] = compile_settings_sheet(key, sheet['rows'])
+            _compiled_sheets[key] = (sheet['hash'], parts[key])
+            recompiled.append(key)
+    term_dict, stripped_term_dict, debug_table, term_index, term_matcher = parts['terminology']
+    desc_lib_df, suggestion_index = parts['desc_lib']
+    version = hashlib.sha1("|".join(hashes).encode()).hexdigest()[:12]
+    settings = Settings(True, debug_table, parts['generic'], parts['forbidden'], parts['ad'], term_dict, stripped_term_dict,
+                        desc_lib_df, parts['safe_bacon'], parts['safe_curacao'], term_index, term_matcher, suggestion_index, version)
+    return settings, recompiled
+
+def read_settings_snapshot(path=SETTINGS_SNAPSHOT_PATH):
+    try:
+        with open(path, encoding='utf-8') as f: snap = json.load(f)
+    except (OSError, ValueError): return None
+    if not isinstance(snap, dict) or snap.get('version') != SETTINGS_SNAPSHOT_VERSION or snap.get('spreadsheet') != SETTINGS_ID: return None
+    return snap
+
+def write_settings_snapshot(snap, path=SETTINGS_SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f: json.dump(snap, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def load_settings(creds_info=None, keyfile=SETTINGS_KEYFILE, client=None, snapshot_path=SETTINGS_SNAPSHOT_PATH):
+    # Live sheets when Google is reachable, skipping the values fetch when the spreadsheet revision
+    # matches the snapshot; the last snapshot when it is not. `client` is anything with gspread's
+    # open_by_key / worksheets / values_batch_get / get_lastUpdateTime.
+    snapshot = read_settings_snapshot(snapshot_path) if snapshot_path else None
+    try:
+        if client is None: client = settings_client(creds_info, keyfile)
+        if client is None: raise RuntimeError("no service account credentials")
+        sh = client.open_by_key(SETTINGS_ID)
+        try: revision = sh.get_lastUpdateTime()
+        except: revision = None
+        if snapshot and revision and snapshot.get('revision') == revision:
+            origin, sheets, fetched_at = 'unchanged', snapshot['sheets'], snapshot['fetched_at']
+        else:
+            origin, sheets, fetched_at = 'sheets', fetch_settings_sheets(sh), time.time()
+            if snapshot_path:
+                snap = {'version': SETTINGS_SNAPSHOT_VERSION, 'spreadsheet': SETTINGS_ID, 'revision': revision,
+                        'fetched_at': fetched_at, 'sheets': sheets}
+                try: write_settings_snapshot(snap, snapshot_path)
+                except OSError: pass
+    except Exception:
+        if not snapshot: return empty_settings()
+        origin, sheets, fetched_at, revision = 'snapshot', snapshot['sheets'], snapshot['fetched_at'], snapshot.get('revision')
+
+    try: settings, recompiled = build_settings(sheets)
+    except Exception: return empty_settings()
+    settings_status.update(origin=origin, revision=revision, fetched_at=fetched_at, recompiled=recompiled)
+    return settings
+
+# --- TRANSLATION MEMORY ---
+# Machine translations are kept in a local SQLite file keyed by (normalized text, source, target),
+# shared by every session and kept across restarts. Rows expire after TRANSLATION_CACHE_TTL and
+# the least recently used ones are dropped once the table grows past TRANSLATION_CACHE_MAX_ROWS.
+TRANSLATION_CACHE_PATH = os.environ.get("OCT_TRANSLATION_CACHE", os.path.join(".oct_cache", "translations.sqlite3"))
+TRANSLATION_CACHE_MAX_ROWS = int(os.environ.get("OCT_TRANSLATION_CACHE_MAX_ROWS", "200000"))
+TRANSLATION_CACHE_TTL = 90 * 24 * 3600
+
+class TranslationCache:
+    def __init__(self, path=TRANSLATION_CACHE_PATH, max_rows=TRANSLATION_CACHE_MAX_ROWS, ttl=TRANSLATION_CACHE_TTL):
+        if path != ":memory:" and os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_rows, self.ttl = max_rows, ttl
+        self.hits = self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS translations (
+                text TEXT NOT NULL, src TEXT NOT NULL, tgt TEXT NOT NULL, result TEXT NOT NULL,
+                created REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (text, src, tgt))""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+
+    def get(self, text, src, tgt):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT result, created FROM translations WHERE text=? AND src=? AND tgt=?", (text, src, tgt)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                self._conn.execute("UPDATE translations SET last_used=? WHERE text=? AND src=? AND tgt=?", (now, text, src, tgt))
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, text, src, tgt, result):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)", (text, src, tgt, result, now, now))
+            self._writes += 1
+            if self._writes % 500 == 0: self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM translations WHERE created < ?", (now - self.ttl,))
+        excess = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_rows
+        if excess > 0:
+            self._conn.execute("DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations ORDER BY last_used LIMIT ?)", (excess,))
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+_shared_lock = threading.Lock()
+_shared = {}
+
+def get_translation_cache():
+    # One translation memory per process, shared by every session and worker thread
+    with _shared_lock:
+        if 'translation_cache' not in _shared:
+            try: _shared['translation_cache'] = TranslationCache()
+            except (sqlite3.Error, OSError): _shared['translation_cache'] = TranslationCache(":memory:")
+        return _shared['translation_cache']
+
+# --- TRANSLATION HELPER (THE FIX IS HERE) ---
+def google_translate(prompt, tgt_lang):
+    from deep_translator import GoogleTranslator
+    return GoogleTranslator(source='auto', target=tgt_lang).translate(prompt)
+
+def machine_translate(word_clean, src_lang, tgt_lang, backend, limiter=None):
+    # Raises the last backend error when every prompt fails
+    prompts = [f"Food: {word_clean}", word_clean]
+    if src_lang == 'ar': prompts = [f"Food item: {word_clean}", word_clean]
+    error = None
+    for prompt in prompts:
+        try:
+            if limiter: limiter.wait()
+            count('mt.requests')
+            tr = backend(prompt, tgt_lang)
+            # CRITICAL FIX: AGGRESSIVE CLEANING OF "FOOD:" PREFIXES IN ARABIC & ENGLISH
+            return re.sub(r'^(Food item|Food|Dish|Item|طعام|الطعام|غذاء|الغذاء|الأكل|وجبة|صنف)[:\s\-\.]*', '', tr, flags=re.IGNORECASE).strip()
+        except Exception as e:
+            count('mt.failures')
+            error = e
+    raise error
+
+def translate_word_safe(word, src_lang, tgt_lang, backend=None, cache=None):
+    word_clean = word.strip()
+    if not word_clean: return ""
+    if backend is None: backend = google_translate
+    if cache is None: cache = get_translation_cache()
+    key = normalize_text(word_clean)
+    cached = cache.get(key, src_lang, tgt_lang)
+    if cached is not None:
+        count('mt.cache_hits')
+        return cached
+    count('mt.cache_misses')
+    try: tr_clean = machine_translate(word_clean, src_lang, tgt_lang, backend)
+    except: return word_clean
+    cache.put(key, src_lang, tgt_lang, tr_clean)
+    return tr_clean
+
+# --- CONCURRENT TRANSLATION STAGE ---
+# Bulk runs collect every chunk that terminology did not cover, translate each distinct chunk
+# once through a bounded thread pool, and scatter the results back to the rows.
+TRANSLATION_WORKERS = int(os.environ.get("OCT_TRANSLATION_WORKERS", "8"))
+TRANSLATION_RATE = float(os.environ.get("OCT_TRANSLATION_RATE", "10"))  # requests per second, process-wide
+TRANSLATION_RETRIES = 2
+TRANSLATION_RUN_TIMEOUT = float(os.environ.get("OCT_TRANSLATION_RUN_TIMEOUT", "600"))
+
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now: time.sleep(slot - now)
+
+def get_rate_limiter():
+    with _shared_lock:
+        if 'rate_limiter' not in _shared: _shared['rate_limiter'] = RateLimiter(TRANSLATION_RATE)
+        return _shared['rate_limiter']
+
+def translate_many(chunks, src_lang, tgt_lang, backend=None, cache=None, limiter=None,
+                   workers=TRANSLATION_WORKERS, retries=TRANSLATION_RETRIES, timeout=TRANSLATION_RUN_TIMEOUT):
+    # Returns {chunk: translation} for the chunks that were translated (cache or backend)
+    if backend is None: backend = google_translate
+    if cache is None: cache = get_translation_cache()
+    if limiter is None: limiter = get_rate_limiter()
+    results, todo = {}, []
+    for chunk in dict.fromkeys(c.strip() for c in chunks):
+        if not chunk: continue
+        cached = cache.get(normalize_text(chunk), src_lang, tgt_lang)
+        if cached is not None: results[chunk] = cached
+        else: todo.append(chunk)
+    count('mt.cache_hits', len(results))
+    count('mt.cache_misses', len(todo))
+    if not todo: return results
+
+    deadline = time.monotonic() + timeout
+    def work(chunk):
+        for attempt in range(retries + 1):
+            if time.monotonic() >= deadline: return None
+            try:
+                tr = machine_translate(chunk, src_lang, tgt_lang, backend, limiter)
+                cache.put(normalize_text(chunk), src_lang, tgt_lang, tr)
+                return tr
+            except Exception:
+                if attempt < retries:
+                    count('mt.retries')
+                    time.sleep(min(0.5 * 2 ** attempt, max(0.0, deadline - time.monotonic())))
+        return None
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo))))
+    try:
+        # Each task runs in a copy of the caller's context so its counters reach the run report
+        futures = {pool.submit(contextvars.copy_context().run, work, chunk): chunk for chunk in todo}
+        done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        count('mt.unfinished', len(futures) - len(done))
+        for fut in done:
+            tr = fut.result()
+            if tr is not None: results[futures[fut]] = tr
+            else: count('mt.gave_up')
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+# --- SEARCH LOGIC (Token-wise) ---
+def search_token_wise_core(input_word, term_dict, stripped_term_dict, allow_google, source_lang, token_index=None):
+    result, source = _search_token_wise(input_word, term_dict, stripped_term_dict, allow_google, source_lang, token_index)
+    if source: count('search.' + source.lower().replace('terminology (', '').rstrip(')').replace(' ', '_'))
+    return result, source
+
+def _search_token_wise(input_word, term_dict, stripped_term_dict, allow_google, source_lang, token_index):
+    if not input_word: return "", ""
+    
+    norm_input = normalize_text(input_word)
+    stripped = strip_text(input_word)
+    
+    # 1. Exact & Stripped
+    if norm_input in term_dict: return term_dict[norm_input], "Terminology (Exact)"
+    if stripped in stripped_term_dict: return stripped_term_dict[stripped], "Terminology (Stripped)"
+    
+    # 2. Singular/Plural
+    if norm_input.endswith('s') and len(norm_input) > 3:
+        sing = norm_input[:-1]
+        if sing in term_dict: return term_dict[sing], "Terminology (Singular)"
+    
+    # 3. Token-wise Fuzzy
+    if token_index is None: token_index = build_token_index(term_dict)
+    best_match_val, best_match_score = fuzzy_token_lookup(norm_input, token_index)
+    if best_match_score >= 90: return best_match_val, "Terminology (Token Match)"
+
+    # 4. Fuzzy
+    if best_match_score >= 85: return best_match_val, "Terminology (Fuzzy)"
+
+    # 5. Google
+    if allow_google:
+        tgt = 'ar' if source_lang == 'English' else 'en'
+        try:
+            # Use the SAFE translate function to strip "Food:"
+            res = translate_word_safe(input_word, source_lang, tgt)
+            return res, "Google"
+        except:
+            return "Error", "Connection"
+    else:
+        return input_word, "Not Found"
+
+# --- BULK TRANSLATION ---
+def plan_translation(text, term_dict, stripped_term_dict, term_matcher=None):
+    # Returns (result, source, None) when no machine translation is needed, else
+    # (None, None, parts) with parts as ('term', value) / ('mt', span) in text order. A span is
+    # the run of words between two terminology hits, sent to MT as one request for context.
+    if not text or pd.isna(text): return text, "None", None
+    text_str = str(text).strip()
+    norm = normalize_text(text_str)
+    
+    # 1. Full Sentence Check
+    if norm in term_dict:
+        count('terminology.exact')
+        return term_dict[norm], "Terminology", None
+    stripped = norm.replace(' ', '')
+    if stripped in stripped_term_dict:
+        count('terminology.stripped')
+        return stripped_term_dict[stripped], "Terminology", None
+    
+    # 2. Squeeze Algorithm
+    if term_matcher is None: term_matcher = build_term_matcher(term_dict)
+    placeholders = {}
+    tokens = {}
+    parts = []
+    pos = 0
+    for start, end, key in select_term_spans(term_matcher, norm):
+        if key not in tokens:
+            tokens[key] = f"__{1000 + len(tokens)}__"
+            placeholders[tokens[key]] = term_dict[key]
+        parts.append(norm[pos:start])
+        parts.append(f" {tokens[key]} ")
+        pos = end
+    parts.append(norm[pos:])
+    processing_text = "".join(parts)
+            
+    plan = []
+    for chunk in processing_text.split():
+        if re.match(r'^__\d+__$', chunk):
+            plan.append(('term', placeholders.get(chunk, chunk)))
+        else:
+            if len(chunk) < 2 and not chunk.isdigit(): continue
+            if plan and plan[-1][0] == 'mt': plan[-1] = ('mt', plan[-1][1] + " " + chunk)
+            else: plan.append(('mt', chunk))
+    count('terminology.phrase', sum(1 for kind, _ in plan if kind == 'term'))
+    count('mt.chunks', sum(1 for kind, _ in plan if kind == 'mt'))
+    return None, None, plan
+
+def assemble_translation(plan, translations):
+    final_output_parts = []
+    used_google = False
+    for kind, val in plan:
+        if kind == 'mt' and val in translations:
+            final_output_parts.append(translations[val])
+            used_google = True
+        else:
+            final_output_parts.append(val)
+    final_text = " ".join(final_output_parts)
+    final_text = re.sub(r'\s+', ' ', final_text).strip()
+    return final_text, "Terminology + Google" if used_google else "Terminology"
+
+def lang_codes(source_lang):
+    return ('en', 'ar') if source_lang == 'English' else ('ar', 'en')
+
+def translate_text_with_priority(text, term_dict, stripped_term_dict, source_lang, term_matcher=None, backend=None):
+    result, source, plan = plan_translation(text, term_dict, stripped_term_dict, term_matcher)
+    if plan is None: return result, source
+    src_code, tgt_code = lang_codes(source_lang)
+    translations = {}
+    for kind, chunk in plan:
+        if kind != 'mt' or chunk in translations: continue
+        try:
+            # Use SAFE translate here too
+            translations[chunk] = translate_word_safe(chunk, src_code, tgt_code, backend)
+        except: pass
+    return assemble_translation(plan, translations)
+
+def translate_texts(texts, term_dict, stripped_term_dict, source_lang, term_matcher=None, backend=None, **mt_options):
+    # Bulk variant of translate_text_with_priority: each distinct text is planned once, then one
+    # deduplicated, concurrent MT pass covers all of them and results are broadcast back
+    if term_matcher is None: term_matcher = build_term_matcher(term_dict)
+    slots = {}
+    codes = [slots.setdefault(t, len(slots)) for t in texts]
+    with stage('translate.terminology'): plans = [plan_translation(t, term_dict, stripped_term_dict, term_matcher) for t in slots]
+    chunks = [chunk for _, _, plan in plans if plan for kind, chunk in plan if kind == 'mt']
+    src_code, tgt_code = lang_codes(source_lang)
+    with stage('translate.mt'): translations = translate_many(chunks, src_code, tgt_code, backend, **mt_options) if chunks else {}
+    unique = [(result, source) if plan is None else assemble_translation(plan, translations) for result, source, plan in plans]
+    return [unique[c] for c in codes]
+
+# --- VALIDATION ---
+MISMATCH_CONFLICTS = [
+    (['chicken', 'poultry'], ['beef', 'meat', 'lamb', 'fish', 'seafood', 'prawn', 'shrimp']),
+    (['beef', 'meat', 'lamb', 'steak'], ['chicken', 'poultry', 'fish', 'seafood', 'prawn', 'shrimp']),
+    (['fish', 'seafood', 'prawn', 'shrimp', 'salmon', 'tuna'], ['chicken', 'poultry', 'beef', 'meat', 'lamb']),
+    (['vegetable', 'veggie', 'vegan'], ['chicken', 'beef', 'meat', 'lamb', 'fish', 'bacon', 'prawn']),
+    (['hot', 'warm', 'steamed', 'grilled'], ['iced', 'cold', 'frozen', 'chilled', 'frosty']),
+    (['iced', 'cold', 'frozen', 'chilled'], ['hot', 'warm', 'steamed']),
+    (['mocha', 'latte', 'coffee', 'espresso', 'cappuccino', 'frappe', 'macchiato'], 
+     ['beef', 'chicken', 'meat', 'lamb', 'burger', 'steak', 'fish', 'prawn', 'rice', 'pasta', 'sandwich'])
+]
+DEFAULT_SAFE_BACON = ['beef', 'turkey', 'veal', 'halal', 'chicken', 'lamb']
+DEFAULT_SAFE_CURACAO = ['syrup', 'flavor', 'flavour', 'mix', 'mocktail', 'virgin']
+CHOICE_SEPARATORS = ['/', '\\', ' or ', ' OR ']
+CHOICE_INDICATORS = ['choice of', 'choice between', 'choose', 'your choice']
+NAME_OPTION_KEYWORDS = [' or ', '/', ' & ']
+COMMON_FILLERS = {'delicious', 'tasty', 'yummy', 'amazing', 'great', 'best', 'famous', 'signature', 'special', 
+                  'fresh', 'hot', 'cold', 'served', 'with', 'dish', 'plate', 'platter', 'bowl', 'cup', 'glass', 'our'}
+
+# --- MISMATCH CATEGORIES ---
+# Every conflict side gets a bit; one word-boundary regex pass (plurals allowed) turns a text
+# into a category bitmask and a conflict is two mask tests. Two extra bits carry the bacon
+# exemption (bacon next to beef/turkey in the description).
+def _compile_mismatch():
+    bits = {}
+    for i, (set_a, set_b) in enumerate(MISMATCH_CONFLICTS):
+        for side, words in ((2 * i, set_a), (2 * i + 1, set_b)):
+            for w in words: bits[w] = bits.get(w, 0) | 1 << side
+    exempt_bacon, exempt_meat = 1 << 2 * len(MISMATCH_CONFLICTS), 1 << 2 * len(MISMATCH_CONFLICTS) + 1
+    bits['bacon'] = bits.get('bacon', 0) | exempt_bacon
+    for w in ('beef', 'turkey'): bits[w] = bits.get(w, 0) | exempt_meat
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(w) for w in sorted(bits, key=len, reverse=True)) + r')(?:e?s)?\b')
+    pairs = [(1 << 2 * i, 1 << 2 * i + 1, f"Mismatch: Name implies '{a[0]}' but Desc implies '{b[0]}'")
+             for i, (a, b) in enumerate(MISMATCH_CONFLICTS)]
+    return pattern, bits, pairs, exempt_bacon | exempt_meat
+
+_MISMATCH_RE, _MISMATCH_BITS, _MISMATCH_PAIRS, _MISMATCH_EXEMPT = _compile_mismatch()
+
+def category_mask(text):
+    mask = 0
+    for word in _MISMATCH_RE.findall(text.lower()): mask |= _MISMATCH_BITS[word]
+    return mask
+
+def check_mismatch(name, desc):
+    n, d = category_mask(name), category_mask(desc)
+    if d & _MISMATCH_EXEMPT == _MISMATCH_EXEMPT: return False, ""
+    for bit_a, bit_b, msg in _MISMATCH_PAIRS:
+        if n & bit_a and d & bit_b: return True, msg
+    return False, ""
+
+def mismatch_column(names, descs):
+    # Column variant of check_mismatch: (hit mask, messages) for aligned name/description sequences
+    n = np.fromiter((category_mask(t) for t in names), dtype=np.int64, count=len(names))
+    d = np.fromiter((category_mask(t) for t in descs), dtype=np.int64, count=len(descs))
+    pending = (d & _MISMATCH_EXEMPT) != _MISMATCH_EXEMPT
+    err = np.full(len(n), '', dtype=object)
+    for bit_a, bit_b, msg in _MISMATCH_PAIRS:
+        hit = pending & ((n & bit_a) != 0) & ((d & bit_b) != 0)
+        err[hit] = msg
+        pending &= ~hit
+    return err != '', err
+
+def find_forbidden(forbidden_matcher, name_norm, desc_norm, bacon_is_safe, curacao_is_safe):
+    # Returns (word, found_in_name) for the first listed forbidden word that applies, else None
+    name_hits = match_ranks(forbidden_matcher, name_norm)
+    desc_hits = match_ranks(forbidden_matcher, desc_norm)
+    for rank in sorted(name_hits | desc_hits):
+        word = forbidden_matcher['words'][rank]
+        w_clean = normalize_text(word)
+        if w_clean == 'bacon' and bacon_is_safe: continue
+        if (w_clean == 'blue curacao' or w_clean == 'curacao') and curacao_is_safe: continue
+        return word, rank in name_hits
+    return None
+
+def find_generic(generic_matcher, combined_text):
+    hits = match_ranks(generic_matcher, combined_text)
+    return generic_matcher['words'][min(hits)] if hits else None
+
+def value_added_error(name_norm, desc_norm, junk_fillers):
+    extra_words = set(desc_norm.split()) - set(name_norm.split())
+    if extra_words:
+        if all(w in junk_fillers for w in extra_words): return "No Value Added"
+    elif fuzz.ratio(name_norm, desc_norm) > 90 and len(desc_norm) > 5:
+        return "Identical to Name"
+    return ""
+
+def build_ruleset(generic_words, forbidden_words, ad_words, desc_lib_df, safe_bacon_list, safe_curacao_list):
+    if not isinstance(forbidden_words, dict): forbidden_words = build_word_matcher(forbidden_words + DEFAULT_FORBIDDEN)
+    if not isinstance(generic_words, dict): generic_words = build_word_matcher(generic_words)
+    return {
+        'generic': generic_words,
+        'forbidden': forbidden_words,
+        'ad_words': ad_words,
+        'desc_lib_df': desc_lib_df,
+        'safe_bacon': list(set(safe_bacon_list).union(DEFAULT_SAFE_BACON)) if safe_bacon_list else DEFAULT_SAFE_BACON,
+        'safe_curacao': list(set(safe_curacao_list).union(DEFAULT_SAFE_CURACAO)) if safe_curacao_list else DEFAULT_SAFE_CURACAO,
+        'junk_fillers': COMMON_FILLERS - ad_words,
+    }
+
+def settings_ruleset(settings):
+    return build_ruleset(settings.generic_words, settings.forbidden_words, settings.ad_words, settings.desc_lib_df, settings.safe_bacon, settings.safe_curacao)
+
+def validate_item(row, sheet_type, generic_words, forbidden_words, ad_words, desc_lib_df, safe_bacon_list, safe_curacao_list):
+    item_name = str(row.get('Item Name', '')).strip()
+    description = str(row.get('Description', '')).strip()
+    desc_raw_lower = description.lower()
+    name_norm = normalize_text(item_name)
+    desc_norm = normalize_text(description)
+    combined_text = (name_norm + " " + desc_norm).lower()
+    rules = build_ruleset(generic_words, forbidden_words, ad_words, desc_lib_df, safe_bacon_list, safe_curacao_list)
+    report = _run_report.get()
+    if report: t = time.perf_counter()
+
+    # desc_lib_df may be the library DataFrame or its prebuilt suggestion index
+    def get_suggestions(itm_name):
+        t0 = time.perf_counter()
+        suggestions = list(suggest_descriptions(itm_name, suggestion_index_for(desc_lib_df)))
+        if report: report.lap('suggestions', t0)
+        return suggestions
+
+    # 1. FORBIDDEN
+    bacon_is_safe = False
+    if 'bacon' in combined_text:
+        if any(safe in combined_text for safe in rules['safe_bacon']): bacon_is_safe = True
+    curacao_is_safe = False
+    if 'curacao' in combined_text:
+        if any(safe in combined_text for safe in rules['safe_curacao']): curacao_is_safe = True
+
+    hit = find_forbidden(rules['forbidden'], name_norm, desc_norm, bacon_is_safe, curacao_is_safe)
+    if report: t = report.lap('forbidden', t)
+    if hit:
+        word, in_name = hit
+        if in_name: return False, row, f"Forbidden in Name: {word}", "Delete Item", []
+        return False, row, f"Forbidden in Desc: {word}", "Delete Desc & Replace", get_suggestions(item_name)
+
+    # 2. CHOICES
+    has_separator = any(s in desc_raw_lower for s in CHOICE_SEPARATORS)
+    has_indicator = any(i in desc_norm for i in CHOICE_INDICATORS)
+    is_between_and = ('between' in desc_norm and 'and' in desc_norm)
+    name_has_option_keyword = any(x in item_name.lower() for x in NAME_OPTION_KEYWORDS)
+    set_score = fuzz.token_set_ratio(name_norm, desc_norm)
+    is_valid_choice = (set_score >= 80) or (name_has_option_keyword and set_score >= 60)
+    if report: t = report.lap('choices', t)
+    
+    if (has_indicator or has_separator or is_between_and) and not is_valid_choice:
+         if sheet_type == "Main Menu":
+             if (has_indicator or is_between_and) and not has_separator:
+                 return False, row, "Undefined Choice", "Delete Item", []
+         else:
+             return False, row, "Choices in SEP", "Delete Description", []
+
+    # 3. MISMATCH & GENERIC
+    is_mismatch, mis_msg = check_mismatch(name_norm, desc_norm)
+    if report: t = report.lap('mismatch', t)
+    if is_mismatch:
+        if sheet_type == "Main Menu": return False, row, mis_msg, "Delete Item", []
+        else: return False, row, mis_msg, "Delete Desc & Replace", get_suggestions(item_name)
+
+    word = find_generic(rules['generic'], combined_text)
+    if report: t = report.lap('generic', t)
+    if word is not None:
+        if sheet_type == "Main Menu": return False, row, f"Generic: {word}", "Delete Item", []
+        else: return False, row, f"Generic: {word}", "Delete Desc & Replace", get_suggestions(item_name)
+
+    # 4. VALUE ADDED
+    err = value_added_error(name_norm, desc_norm, rules['junk_fillers'])
+    if report: report.lap('value_added', t)
+    if err: return False, row, err, "Delete Desc & Replace", get_suggestions(item_name)
+
+    return True, row, "", "Valid", []
+
+# --- VECTORIZED VALIDATION (whole sheet) ---
+def text_column(df, col):
+    if col not in df.columns: return pd.Series('', index=df.index, dtype=object)
+    return pd.Series([str(v).strip() for v in df[col].tolist()], index=df.index, dtype=object)
+
+def normalize_series(series):
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    normed = np.array([normalize_text(u) for u in uniques], dtype=object)
+    return pd.Series(normed[codes], index=series.index, dtype=object)
+
+def _contains_any(series, needles):
+    mask = np.zeros(len(series), dtype=bool)
+    for needle in needles: mask |= series.str.contains(needle, regex=False).to_numpy(dtype=bool)
+    return mask
+
+def validate_frame(df, sheet_type, ruleset, workers=1, pool=None):
+    # Bulk equivalent of validate_item. Rows are reduced to their normalized name/description plus
+    # the two raw-text choice flags, which is everything the rules read, so each distinct item is
+    # validated once and the result is broadcast to every row that repeats it. `pool` is a
+    # validation_pool() for the same ruleset, reused across calls; without one a pool is started here.
+    report = _run_report.get()
+    t0 = time.perf_counter()
+    names = text_column(df, 'Item Name')
+    descs = text_column(df, 'Description')
+    keys = pd.MultiIndex.from_arrays([
+        normalize_series(names), normalize_series(descs),
+        _contains_any(descs.str.lower(), CHOICE_SEPARATORS), _contains_any(names.str.lower(), NAME_OPTION_KEYWORDS),
+    ])
+    codes, uniques = keys.factorize()
+    columns = (uniques.get_level_values(0).to_numpy(dtype=object), uniques.get_level_values(1).to_numpy(dtype=object),
+               uniques.get_level_values(2).to_numpy(dtype=bool), uniques.get_level_values(3).to_numpy(dtype=bool))
+    if report: report.lap('normalize', t0)
+    # A pool that is already running is worth using at any size; starting one is not
+    if len(uniques) and (pool is not None or (workers > 1 and len(uniques) >= PARALLEL_MIN_ITEMS)):
+        (status, error, action), utilization = _validate_parallel(columns, sheet_type, ruleset, workers, pool)
+    else:
+        status, error, action = _validate_unique(*_chunk_args(columns, slice(None)), sheet_type, ruleset)
+        workers, utilization = 1, 1.0
+    out = pd.DataFrame({'Status': status[codes], 'Error': error[codes], 'Action': action[codes]}, index=df.index)
+    out.attrs['unique_rows'] = len(uniques)
+    out.attrs['workers'] = workers
+    out.attrs['utilization'] = utilization
+    return out
+
+# --- PARALLEL VALIDATION ---
+# Distinct items are cut into chunks and validated in worker processes. The ruleset is pickled
+# once per worker by the pool initializer instead of once per chunk; results merge in order.
+# Workers are started from a fork server (spawn where there is none), never forked from this
+# process: the app and the batch queue are multithreaded, and a fork can copy a lock (logging,
+# the translation cache, thread pools) held by another thread and deadlock the child.
+VALIDATION_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+VALIDATION_WORKERS = int(os.environ.get("OCT_VALIDATION_WORKERS", "1"))
+PARALLEL_MIN_ITEMS = 2000  # below this, starting a pool costs more than it saves
+CHUNKS_PER_WORKER = 4
+
+_worker_ruleset = None
+
+def validation_pool(ruleset, workers):
+    # Worker processes holding `ruleset`; one pool can serve every chunk of a run
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(VALIDATION_START_METHOD),
+                               initializer=_init_validation_worker, initargs=(ruleset,))
+
+def _init_validation_worker(ruleset):
+    global _worker_ruleset
+    _worker_ruleset = ruleset
+
+def _chunk_args(columns, sl):
+    name_norm, desc_norm, has_separator, name_has_option = (c[sl] for c in columns)
+    return pd.Series(name_norm, dtype=object), pd.Series(desc_norm, dtype=object), has_separator, name_has_option
+
+def _validate_chunk(columns, sheet_type):
+    t0 = time.process_time()
+    with run_report() as report:
+        result = _validate_unique(*_chunk_args(columns, slice(None)), sheet_type, _worker_ruleset)
+    return result, time.process_time() - t0, report.rules
+
+def _validate_parallel(columns, sheet_type, ruleset, workers, pool=None):
+    # Returns the merged (status, error, action) arrays and the CPU utilization: CPU time spent on
+    # chunks over wall time (about how many cores were busy). It is not a speedup over a serial run.
+    n = len(columns[0])
+    size = max(-(-n // (workers * CHUNKS_PER_WORKER)), PARALLEL_MIN_ITEMS // CHUNKS_PER_WORKER)
+    t0 = time.perf_counter()
+    own_pool = pool is None
+    if own_pool: pool = validation_pool(ruleset, workers)
+    try:
+        futures = [pool.submit(_validate_chunk, tuple(c[i:i + size] for c in columns), sheet_type) for i in range(0, n, size)]
+        results = [f.result() for f in futures]
+    finally:
+        if own_pool: pool.shutdown()
+    wall = time.perf_counter() - t0
+    report = _run_report.get()
+    if report:
+        for _, _, rules in results: report.merge_rules(rules)
+    merged = tuple(np.concatenate([r[k] for r, _, _ in results]) for k in range(3))
+    return merged, round(sum(secs for _, secs, _ in results) / wall, 2) if wall else 1.0
+
+def _validate_unique(name_norm, desc_norm, has_separator, name_has_option, sheet_type, ruleset):
+    # Rules run as column masks over distinct items, in validate_item's priority order
+    combined = (name_norm + " " + desc_norm).str.lower()
+    main_menu = sheet_type == "Main Menu"
+
+    n = len(name_norm)
+    status = np.full(n, 'Valid', dtype=object)
+    error = np.full(n, '', dtype=object)
+    action = np.full(n, '', dtype=object)
+    pending = np.ones(n, dtype=bool)
+    nn, dn, cn = name_norm.tolist(), desc_norm.tolist(), combined.tolist()
+    report = _run_report.get()
+    t = time.perf_counter()
+
+    def decide(mask, err, act):
+        mask = mask & pending
+        status[mask] = 'Issue'; error[mask] = err[mask] if isinstance(err, np.ndarray) else err
+        action[mask] = act[mask] if isinstance(act, np.ndarray) else act
+        pending[mask] = False
+
+    # 1. FORBIDDEN
+    bacon_safe = _contains_any(combined, ['bacon']) & _contains_any(combined, ruleset['safe_bacon'])
+    curacao_safe = _contains_any(combined, ['curacao']) & _contains_any(combined, ruleset['safe_curacao'])
+    f_err = np.full(n, '', dtype=object); f_act = np.full(n, '', dtype=object); f_mask = np.zeros(n, dtype=bool)
+    for i in range(n):
+        hit = find_forbidden(ruleset['forbidden'], nn[i], dn[i], bacon_safe[i], curacao_safe[i])
+        if hit:
+            word, in_name = hit
+            f_mask[i] = True
+            f_err[i] = f"Forbidden in Name: {word}" if in_name else f"Forbidden in Desc: {word}"
+            f_act[i] = "Delete Item" if in_name else "Delete Desc & Replace"
+    decide(f_mask, f_err, f_act)
+    if report: t = report.lap('forbidden', t)
+
+    # 2. CHOICES
+    has_indicator = _contains_any(desc_norm, CHOICE_INDICATORS)
+    is_between_and = _contains_any(desc_norm, ['between']) & _contains_any(desc_norm, ['and'])
+    candidates = (has_indicator | has_separator | is_between_and) & pending
+    set_score = np.zeros(n)
+    for i in np.flatnonzero(candidates): set_score[i] = fuzz.token_set_ratio(nn[i], dn[i])
+    is_valid_choice = (set_score >= 80) | (name_has_option & (set_score >= 60))
+    flagged = candidates & ~is_valid_choice
+    if main_menu: decide(flagged & (has_indicator | is_between_and) & ~has_separator, "Undefined Choice", "Delete Item")
+    else: decide(flagged, "Choices in SEP", "Delete Description")
+    if report: t = report.lap('choices', t)
+
+    # 3. MISMATCH & GENERIC
+    m_mask, m_err = mismatch_column(nn, dn)
+    decide(m_mask, m_err, "Delete Item" if main_menu else "Delete Desc & Replace")
+    if report: t = report.lap('mismatch', t)
+
+    g_err = np.full(n, '', dtype=object)
+    for i in np.flatnonzero(pending):
+        word = find_generic(ruleset['generic'], cn[i])
+        if word is not None: g_err[i] = f"Generic: {word}"
+    decide(g_err != '', g_err, "Delete Item" if main_menu else "Delete Desc & Replace")
+    if report: t = report.lap('generic', t)
+
+    # 4. VALUE ADDED
+    v_err = np.full(n, '', dtype=object)
+    for i in np.flatnonzero(pending): v_err[i] = value_added_error(nn[i], dn[i], ruleset['junk_fillers'])
+    decide(v_err != '', v_err, "Delete Desc & Replace")
+    if report: report.lap('value_added', t)
+
+    return status, error, action
+
+# --- WORKBOOK INGESTION ---
+# Only the selected sheet becomes a DataFrame; the other sheets are streamed from the original
+# bytes with openpyxl's read-only reader when the result is exported.
+def workbook_sheet_names(data):
+    import openpyxl
+    wb = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+    try: return list(wb.sheetnames)
+    finally: wb.close()
+
+def sheet_columns(data, is_csv, sheet):
+    if is_csv: return pd.read_csv(BytesIO(data), nrows=5).columns.tolist()
+    return pd.read_excel(BytesIO(data), sheet_name=sheet, nrows=5).columns.tolist()
+
+def guess_columns(cols):
+    # (name index, description index) by the column-mapping heuristic the sidebar has always used
+    idx_n, idx_d = 0, 0
+    for i, col in enumerate(cols):
+        c_lower = str(col).lower()
+        if 'item' in c_lower or 'name' in c_lower: idx_n = i
+        if 'desc' in c_lower: idx_d = i
+    return idx_n, idx_d
+
+def read_sheet(data, is_csv, sheet):
+    if is_csv: return pd.read_csv(BytesIO(data))
+    return pd.read_excel(BytesIO(data), sheet_name=sheet)
+
+def iter_sheet_rows(data, sheet):
+    import openpyxl
+    wb = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+    try:
+        for row in wb[sheet].iter_rows(values_only=True): yield row
+    finally: wb.close()
+
+# --- EXPORT ---
+# Excel is written with openpyxl's write-only workbook; CSV and Parquet skip the spreadsheet encoder.
+# The app's download drops every bookkeeping column (the grid shows the checks); files written
+# outside the app keep the check columns, since they are the only record of which rows have issues
+CHECK_COLUMNS = ['Status', 'Error', 'Action']
+INTERNAL_COLUMNS = CHECK_COLUMNS + ['Name Source', 'Desc Source']
+EXPORT_FORMATS = {
+    "Excel (.xlsx)": ("Processed_Menu.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": ("Processed_Menu.csv", "text/csv"),
+    "Parquet": ("Processed_Menu.parquet", "application/octet-stream"),
+}
+
+def result_digest(df, source=None):
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update(repr(list(df.columns)).encode())
+    if source: h.update(repr((source.get('digest'), source['sheets'], source['current'])).encode())
+    return h.hexdigest()
+
+def export_view(df, include_checks=False):
+    return df.drop(columns=[c for c in INTERNAL_COLUMNS if c in df.columns and not (include_checks and c in CHECK_COLUMNS)])
+
+def _cell(v):
+    return None if pd.api.types.is_scalar(v) and pd.isna(v) else v
+
+def _append_frame(ws, df):
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None): ws.append([_cell(v) for v in row])
+
+def build_xlsx(df, source=None):
+    import openpyxl
+    wb = openpyxl.Workbook(write_only=True)
+    if source and source.get('data') is not None:
+        for s_name in source['sheets']:
+            ws = wb.create_sheet(s_name)
+            if s_name == source['current']: _append_frame(ws, df)
+            else:
+                for row in iter_sheet_rows(source['data'], s_name): ws.append(row)
+    else:
+        _append_frame(wb.create_sheet(source['current'] if source else "Sheet1"), df)
+    out = BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+def build_parquet(df):
+    # Text columns can mix numbers and strings; Parquet needs one type per column
+    fixed = df.rename(columns=str)
+    for col in fixed.columns[fixed.dtypes == object]:
+        fixed[col] = fixed[col].map(lambda v: None if _cell(v) is None else str(v))
+    out = BytesIO()
+    fixed.to_parquet(out, index=False)
+    return out.getvalue()
+
+def export_bytes(df, fmt, source=None, include_checks=False):
+    view = export_view(df, include_checks)
+    if fmt == "CSV": return view.to_csv(index=False).encode('utf-8-sig')
+    if fmt == "Parquet": return build_parquet(view)
+    return build_xlsx(view, source)
+
+def parquet_available():
+    try: import pyarrow
+    except ImportError: return False
+    return True
+
+# --- RESULTS VIEW ---
+# Large results stay on the server: filters resolve against row positions precomputed per value
+# of each filter column, and only the requested page is sliced out for display.
+RESULT_FILTERS = ['Status', 'Error', 'Action']
+RESULT_PAGE_SIZES = [50, 100, 250, 500, 1000]
+
+def build_result_index(df):
+    # {column: {value: row positions, ascending}} for each filter column present in df
+    index = {}
+    for col in RESULT_FILTERS:
+        if col not in df.columns: continue
+        codes, values = pd.factorize(df[col].fillna('').astype(str), sort=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+        index[col] = {v: order[bounds[i]:bounds[i + 1]] for i, v in enumerate(values)}
+    return index
+
+def filter_rows(index, total, selected):
+    # Positions of the rows matching every column's selection (any of its values); all rows
+    # when nothing is selected
+    rows = None
+    for col, values in selected.items():
+        if not values: continue
+        parts = [index.get(col, {}).get(v) for v in values]
+        parts = [p for p in parts if p is not None]
+        hit = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+        rows = hit if rows is None else np.intersect1d(rows, hit, assume_unique=True)
+    return np.arange(total) if rows is None else rows
+
+def result_page(df, rows, page, page_size):
+    # One page (0-based) of the filtered rows
+    return df.iloc[rows[page * page_size:(page + 1) * page_size]]
+
+# --- GRID EDITS ---
+# Rows edited in the results grid are found by row hash. Edits are written back in place, and
+# only rows whose name or description text changed are validated and translated again.
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def changed_rows(before, after):
+    # Index labels of the rows that differ between two frames with the same index and columns
+    return after.index[row_hashes(before) != row_hashes(after)]
+
+def edit_digest(digest, df, labels):
+    # Digest of the result after an edit: the previous digest chained with the edited rows, so
+    # caches keyed by it move on without rehashing the whole frame
+    h = hashlib.sha1(digest.encode())
+    h.update(row_hashes(df.loc[labels]).tobytes())
+    return h.hexdigest()
+
+def apply_edits(df, edited, settings, opts):
+    # opts holds the run's sheet_type, action_mode, source_lang, name_col, desc_col,
+    # target_name_col and target_desc_col. Returns counts of edited, rechecked and retranslated rows.
+    labels = edited.index
+    before = df.loc[labels, [c for c in edited.columns if c in df.columns]]
+    cols = [c for c in before.columns if not before[c].equals(edited[c])]
+    for col in cols: df.loc[labels, col] = edited[col].to_numpy()
+    text_cols = [c for c in (opts['name_col'], opts['desc_col']) if c in cols]
+    moved = before[text_cols].astype(str) != df.loc[labels, text_cols].astype(str)
+    stats = {'edited': len(labels), 'rechecked': 0, 'retranslated': 0}
+    recheck = labels[moved.any(axis=1).to_numpy()]
+    if not len(recheck): return stats
+
+    if "Check" in opts['action_mode']:
+        part = df.loc[recheck].rename(columns={opts['name_col']: 'Item Name', opts['desc_col']: 'Description'})
+        ruleset = settings_ruleset(settings)
+        checks = validate_frame(part, opts['sheet_type'], ruleset)
+        df.loc[recheck, ['Status', 'Error', 'Action']] = checks[['Status', 'Error', 'Action']].to_numpy()
+        stats['rechecked'] = len(recheck)
+    if "Translate" in opts['action_mode']:
+        for col, target, source_col in ((opts['name_col'], opts['target_name_col'], 'Name Source'), (opts['desc_col'], opts['target_desc_col'], 'Desc Source')):
+            if col not in moved.columns or target not in df.columns: continue
+            rows = labels[moved[col].to_numpy()]
+            if not len(rows): continue
+            translated = translate_texts(df.loc[rows, col].tolist(), settings.term_dict, settings.stripped_term_dict, opts['source_lang'], settings.term_matcher)
+            df.loc[rows, target] = [t for t, _ in translated]
+            df.loc[rows, source_col] = [src for _, src in translated]
+            stats['retranslated'] += len(rows)
+    return stats
+
+def dedup_ratio(total, unique):
+    return f"{1 - unique / total:.0%}" if total else "0%"
+
+# --- BULK PIPELINE ---
+BULK_CHUNK_ROWS = int(os.environ.get("OCT_BULK_CHUNK_ROWS", "2000"))
+
+def process_chunk(df, settings, sheet_type, action_mode, source_lang="English",
+                  target_name_col="Name (Translated)", target_desc_col="Desc (Translated)",
+                  name_col='Item Name', desc_col='Description', workers=1, pool=None):
+    # Runs the bulk processor on a sheet (or a slice of one) and returns (result_df, stats), with
+    # the mapped columns under their original names. Raises ValueError when the name column is missing.
+    # The renames are copy-on-write views (pandas 3): the source columns are shared with `df`, and the check
+    # and translation results are added as new columns without copying the frame.
+    result_df = df.rename(columns={name_col: 'Item Name', desc_col: 'Description'})
+    if 'Item Name' not in result_df.columns: raise ValueError("Error mapping columns.")
+    stats = {'rows': len(result_df)}
+
+    if "Check" in action_mode:
+        with stage('validate'):
+            ruleset = settings_ruleset(settings)
+            checks = validate_frame(result_df, sheet_type, ruleset, workers, pool)
+        for col in ['Status', 'Error', 'Action']: result_df[col] = checks[col]
+        stats.update(unique_items=checks.attrs['unique_rows'], workers=checks.attrs['workers'], utilization=checks.attrs['utilization'])
+
+    if "Translate" in action_mode:
+        if target_name_col not in result_df.columns: result_df[target_name_col] = ''
+        if target_desc_col not in result_df.columns: result_df[target_desc_col] = ''
+        names = result_df['Item Name'].tolist()
+        descs = result_df['Description'].tolist() if 'Description' in result_df.columns else [None] * len(names)
+        with stage('translate'): translated = translate_texts(names + descs, settings.term_dict, settings.stripped_term_dict, source_lang, settings.term_matcher)
+        stats.update(texts=len(names + descs), unique_texts=len(pd.unique(pd.Series(names + descs, dtype=object))))
+        result_df[target_name_col] = [t for t, _ in translated[:len(names)]]
+        result_df[target_desc_col] = [t for t, _ in translated[len(names):]]
+        result_df['Name Source'] = [src for _, src in translated[:len(names)]]
+        result_df['Desc Source'] = [src for _, src in translated[len(names):]]
+
+    display_df = result_df.rename(columns={'Item Name': name_col, 'Description': desc_col})
+    count('rows', len(display_df))
+    return display_df, stats
+
+def merge_run_stats(total, stats):
+    # Adds one chunk's stats to the running totals; utilization is averaged over validated items
+    merged = dict(total)
+    for key in ('rows', 'unique_items', 'texts', 'unique_texts'):
+        if key in stats: merged[key] = merged.get(key, 0) + stats[key]
+    if 'workers' in stats:
+        before = total.get('unique_items', 0)
+        merged['workers'] = max(total.get('workers', 1), stats['workers'])
+        merged['utilization'] = round((total.get('utilization', 1.0) * before + stats['utilization'] * stats['unique_items']) / (merged['unique_items'] or 1), 2)
+    return merged
+
+def format_run_notes(stats):
+    notes = [f"{stats['rows']} rows"]
+    if 'unique_items' in stats:
+        notes.append(f"validated {stats['unique_items']} unique items ({dedup_ratio(stats['rows'], stats['unique_items'])} deduplicated)")
+        if stats['workers'] > 1: notes.append(f"{stats['workers']} workers, {stats['utilization']} cores busy")
+    if 'texts' in stats:
+        notes.append(f"translated {stats['unique_texts']} unique texts ({dedup_ratio(stats['texts'], stats['unique_texts'])} deduplicated)")
+    return notes
+
+def process_frame(df, settings, sheet_type, action_mode, source_lang="English",
+                  target_name_col="Name (Translated)", target_desc_col="Desc (Translated)",
+                  name_col='Item Name', desc_col='Description', workers=1, pool=None):
+    # Whole sheet in one go; returns (result_df, run_notes)
+    display_df, stats = process_chunk(df, settings, sheet_type, action_mode, source_lang, target_name_col, target_desc_col, name_col, desc_col, workers, pool)
+    return display_df, format_run_notes(stats)
+
+def iter_chunks(df, settings, sheet_type, action_mode, source_lang="English",
+                target_name_col="Name (Translated)", target_desc_col="Desc (Translated)",
+                name_col='Item Name', desc_col='Description', workers=1, start=0, chunk_rows=BULK_CHUNK_ROWS):
+    # Processes consecutive row slices from `start` and yields (end_row, result_chunk, stats) after
+    # each one, so callers can report progress, keep partial results and resume. Chunks grow when
+    # parallel validation is on so each still clears PARALLEL_MIN_ITEMS; their worker pool is started
+    # once for the run and shut down when the generator is closed.
+    if name_col not in df.columns and 'Item Name' not in df.columns: raise ValueError("Error mapping columns.")
+    pool = None
+    if workers > 1:
+        chunk_rows = max(chunk_rows, PARALLEL_MIN_ITEMS * workers)
+        if "Check" in action_mode: pool = validation_pool(settings_ruleset(settings), workers)
+    try:
+        for begin in range(start, len(df), chunk_rows):
+            part, stats = process_chunk(df.iloc[begin:begin + chunk_rows], settings, sheet_type, action_mode, source_lang,
+                                        target_name_col, target_desc_col, name_col, desc_col, workers, pool)
+            yield begin + len(part), part, stats
+    finally:
+        if pool: pool.shutdown(cancel_futures=True)
+
+# --- WORKBOOK PIPELINE ---
+# One uploaded or on-disk menu end to end: the first sheet (or opts['sheet']), columns guessed
+# from the header unless given, and the processed file in the input's format. Shared by the CLI
+# and the batch queue.
+def processed_name(name):
+    stem, ext = os.path.splitext(os.path.basename(name))
+    return f"{stem}_processed{ext.lower()}"
+
+def process_workbook(data, name, settings, opts, pool=None):
+    # Returns (payload, result_df, run_notes). `pool` is a validation_pool() shared across files
+    is_csv = name.lower().endswith('.csv')
+    sheets = [None] if is_csv else workbook_sheet_names(data)
+    # A CSV has a single unnamed sheet, so a requested sheet name only applies to workbooks
+    sheet = opts['sheet'] if opts.get('sheet') is not None and not is_csv else sheets[0]
+    if sheet not in sheets: raise ValueError(f"no sheet named {sheet!r}")
+    with stage('read'): df = read_sheet(data, is_csv, sheet)
+
+    cols = list(df.columns)
+    idx_n, idx_d = guess_columns(cols)
+    name_col = opts.get('name_col') or (cols[idx_n] if cols else 'Item Name')
+    desc_col = opts.get('desc_col') or (cols[idx_d] if cols else 'Description')
+    result_df, run_notes = process_frame(df, settings, opts['sheet_type'], opts['action_mode'], opts['source_lang'],
+                                         opts.get('target_name_col', "Name (Translated)"), opts.get('target_desc_col', "Desc (Translated)"),
+                                         name_col, desc_col, opts.get('workers', 1), pool)
+    # The app's export projection, keeping Status/Error/Action so the file says which rows have issues
+    with stage('export'):
+        if is_csv: payload = export_bytes(result_df, "CSV", include_checks=True)
+        else: payload = export_bytes(result_df, "Excel (.xlsx)", {'data': data, 'sheets': sheets, 'current': sheet}, include_checks=True)
+    return payload, result_df, run_notes
+
+# --- BATCH QUEUE ---
+# Many menus at once: each file is a job run by a fixed pool of background threads, so at most
+# `workers` files are in flight. The threads only read, translate and export (mostly waiting on
+# Google, which still goes through the process-wide rate limiter); validation, the CPU-bound part,
+# is sent to one shared validation_pool() of `processes` workers, so it is not held to one core by
+# the GIL. Jobs are plain dicts updated under a lock; callers poll snapshot() for progress.
+BATCH_WORKERS = int(os.environ.get("OCT_BATCH_WORKERS", str(min(4, (os.cpu_count() or 1) + 1))))
+BATCH_MAX_FILES = int(os.environ.get("OCT_BATCH_MAX_FILES", "100"))
+BATCH_PROCESSES = int(os.environ.get("OCT_BATCH_PROCESSES", str(os.cpu_count() or 1)))
+BATCH_DONE = ('done', 'failed', 'cancelled')
+
+class BatchQueue:
+    def __init__(self, settings, opts, workers=BATCH_WORKERS, max_files=BATCH_MAX_FILES, processes=BATCH_PROCESSES):
+        self.settings, self.opts, self.max_files = settings, opts, max_files
+        self.processes = max(1, processes)
+        self._validation = None
+        self.jobs = []
+        self.started = time.time()
+        self.cancelled = False
+        self._zip = None
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="oct-batch")
+
+    def submit(self, name, data):
+        # Raises ValueError once the batch holds max_files files
+        with self._lock:
+            if len(self.jobs) >= self.max_files: raise ValueError(f"A batch takes at most {self.max_files} files.")
+            job = {'file': name, 'status': 'queued', 'rows': 0, 'issues': 0, 'seconds': 0.0, 'rows_per_s': None,
+                   'notes': '', 'error': None, 'output': None}
+            self.jobs.append(job)
+        self._pool.submit(self._run, job, data)
+        return job
+
+    def _update(self, job, **fields):
+        with self._lock: job.update(fields)
+
+    def _validation_pool(self):
+        # Started by the first file that validates, shut down once nothing is queued or running
+        if "Check" not in self.opts['action_mode']: return None
+        with self._lock:
+            if self._validation is None: self._validation = validation_pool(settings_ruleset(self.settings), self.processes)
+            return self._validation
+
+    def _release_validation_pool(self):
+        with self._lock:
+            if not all(job['status'] in BATCH_DONE for job in self.jobs) or self._validation is None: return
+            pool, self._validation = self._validation, None
+        pool.shutdown(wait=False)
+
+    def _run(self, job, data):
+        if self.cancelled:
+            self._update(job, status='cancelled')
+            return self._release_validation_pool()
+        self._update(job, status='running')
+        t0 = time.perf_counter()
+        try:
+            with run_report(job['file']) as report:
+                payload, result_df, run_notes = process_workbook(data, job['file'], self.settings, dict(self.opts, workers=self.processes), self._validation_pool())
+            log_report(report, file=job['file'], mode=self.opts['action_mode'], rows=len(result_df), batch=True)
+        except Exception as e:
+            self._update(job, status='failed', error=str(e), seconds=time.perf_counter() - t0)
+            return self._release_validation_pool()
+        secs = time.perf_counter() - t0
+        issues = int((result_df['Status'] == 'Issue').sum()) if 'Status' in result_df.columns else 0
+        self._update(job, status='done', rows=len(result_df), issues=issues, seconds=secs, rows_per_s=round(len(result_df) / secs) if secs else None,
+                     notes=" · ".join(run_notes), output=(processed_name(job['file']), payload))
+        self._release_validation_pool()
+
+    def snapshot(self):
+        with self._lock: return [{k: v for k, v in job.items() if k != 'output'} for job in self.jobs]
+
+    def finished(self):
+        with self._lock: return all(job['status'] in BATCH_DONE for job in self.jobs)
+
+    def cancel(self):
+        # Queued files are skipped; files already running finish
+        self.cancelled = True
+
+    def zip_bytes(self):
+        # Every finished file in one archive; repeated names get a numeric suffix. Built once the batch is done
+        if self._zip is not None: return self._zip
+        with self._lock: outputs = [job['output'] for job in self.jobs if job['output']]
+        out, seen = BytesIO(), {}
+        with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name, payload in outputs:
+                seen[name] = seen.get(name, 0) + 1
+                if seen[name] > 1:
+                    stem, ext = os.path.splitext(name)
+                    name = f"{stem}_{seen[name]}{ext}"
+                zf.writestr(name, payload)
+        if self.finished(): self._zip = out.getvalue()
+        return out.getvalue()
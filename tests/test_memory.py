@@ -0,0 +1,22 @@
+# Per-run memory reports: a run's peak is its own, not the process's lifetime high-water mark.
+import oct_core as core
+
+def test_small_run_after_large_one_is_not_over_budget(monkeypatch):
+    rss = {'now': 100.0, 'hwm': 600.0}
+    monkeypatch.setattr(core, 'rss_mb', lambda: rss['now'])
+    monkeypatch.setattr(core, 'max_rss_mb', lambda: rss['hwm'])
+    monkeypatch.setattr(core, 'MEMORY_BUDGET_MB', 400.0)
+    with core.run_report("small") as report:
+        with core.stage('work'): rss['now'] = 120.0
+    mem = report.memory()
+    assert mem['peak_mb'] == 120.0 and mem['run_mb'] == 20.0 and mem['over_budget'] is False
+
+def test_spike_between_samples_counts_when_it_raises_the_high_water_mark(monkeypatch):
+    rss = {'now': 100.0, 'hwm': 150.0}
+    monkeypatch.setattr(core, 'rss_mb', lambda: rss['now'])
+    monkeypatch.setattr(core, 'max_rss_mb', lambda: rss['hwm'])
+    monkeypatch.setattr(core, 'MEMORY_BUDGET_MB', 400.0)
+    with core.run_report("spiky") as report:
+        with core.stage('work'): rss['hwm'] = 500.0  # allocated and freed before the stage ends
+    mem = report.memory()
+    assert mem['peak_mb'] == 500.0 and mem['run_mb'] == 400.0 and mem['over_budget'] is True
@@ -0,0 +1,58 @@
+# Name/description category conflicts: whole words only (plurals allowed), the bacon exemption,
+# and the column variant agreeing with check_mismatch row by row.
+import pytest
+
+import oct_core as core
+
+def bits(*words):
+    mask = 0
+    for w in words: mask |= core._MISMATCH_BITS[w]
+    return mask
+
+@pytest.mark.parametrize("text, words", [
+    ("Grilled Shrimp", ("grilled", "shrimp")),
+    ("ham and shrimp", ("shrimp",)),       # 'ham' is no category and is not found inside 'shrimp'
+    ("Espresso Shot", ("espresso",)),      # 'hot' inside 'shot'
+    ("Meatball Sub", ()),                  # 'meat' inside 'meatball'
+    ("Scolded Lambrusco", ()),             # 'cold' inside 'scolded', 'lamb' inside 'lambrusco'
+    ("HOT-dog", ("hot",)),
+])
+def test_category_words_match_on_word_boundaries(text, words):
+    assert core.category_mask(text) == bits(*words)
+
+@pytest.mark.parametrize("text, word", [
+    ("Beef Burgers", "burger"),
+    ("club sandwiches", "sandwich"),
+    ("two lattes", "latte"),
+    ("grilled prawns", "prawn"),
+    ("fishes", "fish"),
+])
+def test_plurals_match_their_category(text, word):
+    assert core.category_mask(text) & bits(word) == bits(word)
+
+@pytest.mark.parametrize("name, desc, expected", [
+    ("Chicken Burger", "juicy beef patty", "Mismatch: Name implies 'chicken' but Desc implies 'beef'"),
+    ("Iced Latte", "served hot", "Mismatch: Name implies 'iced' but Desc implies 'hot'"),
+    ("Latte", "with two beef burgers", "Mismatch: Name implies 'mocha' but Desc implies 'beef'"),
+    ("Espresso Shot", "served cold", ""),
+    ("Shrimp Cocktail", "with ham", ""),
+    ("Chicken Burger", "chicken with meatballs", ""),
+])
+def test_check_mismatch(name, desc, expected):
+    assert core.check_mismatch(name, desc) == (bool(expected), expected)
+
+@pytest.mark.parametrize("name, desc, expected", [
+    ("Veggie Burger", "topped with turkey bacon", False),   # bacon next to turkey is exempt
+    ("Veggie Burger", "topped with beef bacon", False),
+    ("Veggie Burger", "topped with bacon", True),
+    ("Veggie Burger", "topped with turkey", False),         # turkey is no conflict word on its own
+    ("Chicken Wrap", "beef strips", True),                  # the exemption needs bacon too
+])
+def test_bacon_exemption(name, desc, expected):
+    assert core.check_mismatch(name, desc)[0] is expected
+
+def test_column_variant_matches_check_mismatch():
+    names = ["Chicken Burger", "Iced Latte", "Espresso Shot", "Veggie Burger", "Veggie Burger", "Fish Tacos", ""]
+    descs = ["juicy beef patty", "served hot", "served cold", "turkey bacon", "bacon", "chicken and prawns", ""]
+    mask, err = core.mismatch_column(names, descs)
+    assert [(bool(m), e) for m, e in zip(mask, err)] == [core.check_mismatch(n, d) for n, d in zip(names, descs)]
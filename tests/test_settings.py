@@ -0,0 +1,94 @@
+# Settings loading against a local stand-in for the gspread client: one listing and one batchGet
+# per fetch, the snapshot reused on an unchanged revision or when Google is unreachable, and only
+# changed sheets recompiled.
+import pytest
+
+import oct_core as core
+
+SHEETS = {
+    "Generic_Words": [["combo"], ["meal"]],
+    "Ad_Words": [["order now"]],
+    "Forbidden_Words": [["Word"], ["wine"]],
+    "Safe_Bacon": [["beef"]],
+    "Safe_Curacao": [["syrup"]],
+    "Terminology": [["English", "Arabic"], ["chicken", "دجاج"], ["cheese", "جبنة"]],
+    "Description_Library": [["Item Name", "Eng Desc", "Arb Desc"], ["Chicken Burger", "juicy chicken", "برجر دجاج"]],
+}
+
+class FakeWorksheet:
+    def __init__(self, title): self.title = title
+
+class FakeSpreadsheet:
+    def __init__(self, sheets, revision):
+        self.sheets, self.revision = sheets, revision
+        self.calls = {'worksheets': 0, 'values_batch_get': 0}
+
+    def worksheets(self):
+        self.calls['worksheets'] += 1
+        return [FakeWorksheet(title) for title in self.sheets]
+
+    def values_batch_get(self, ranges):
+        self.calls['values_batch_get'] += 1
+        return {'valueRanges': [{'range': r, 'values': self.sheets[r.strip("'").replace("''", "'")]} for r in ranges]}
+
+    def get_lastUpdateTime(self):
+        return self.revision
+
+class FakeClient:
+    def __init__(self, sheets=SHEETS, revision="2026-01-01T00:00:00.000Z"):
+        self.sh = FakeSpreadsheet({k: [list(r) for r in v] for k, v in sheets.items()}, revision)
+
+    def open_by_key(self, key):
+        assert key == core.SETTINGS_ID
+        return self.sh
+
+class OfflineClient:
+    def open_by_key(self, key):
+        raise ConnectionError("offline")
+
+@pytest.fixture(autouse=True)
+def fresh_compiled_sheets():
+    core._compiled_sheets.clear()
+    yield
+    core._compiled_sheets.clear()
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "settings_snapshot.json")
+
+def test_fetch_lists_worksheets_once_and_batches_values(snapshot_path):
+    client = FakeClient()
+    settings = core.load_settings(client=client, snapshot_path=snapshot_path)
+    assert settings.ok is True
+    assert client.sh.calls == {'worksheets': 1, 'values_batch_get': 1}
+    assert settings.term_dict[core.normalize_text("chicken")] == "دجاج"
+    assert core.settings_status['origin'] == 'sheets'
+    assert core.read_settings_snapshot(snapshot_path)['revision'] == client.sh.revision
+
+def test_unchanged_revision_uses_snapshot_without_fetching_values(snapshot_path):
+    first = core.load_settings(client=FakeClient(), snapshot_path=snapshot_path)
+    client = FakeClient()
+    settings = core.load_settings(client=client, snapshot_path=snapshot_path)
+    assert client.sh.calls == {'worksheets': 0, 'values_batch_get': 0}
+    assert core.settings_status['origin'] == 'unchanged'
+    assert settings.version == first.version
+
+def test_offline_falls_back_to_snapshot(snapshot_path):
+    first = core.load_settings(client=FakeClient(), snapshot_path=snapshot_path)
+    settings = core.load_settings(client=OfflineClient(), snapshot_path=snapshot_path)
+    assert settings.ok is True
+    assert core.settings_status['origin'] == 'snapshot'
+    assert settings.version == first.version
+
+def test_offline_without_snapshot_returns_empty_settings(snapshot_path):
+    settings = core.load_settings(client=OfflineClient(), snapshot_path=snapshot_path)
+    assert settings.ok is False
+
+def test_only_changed_sheets_are_recompiled(snapshot_path):
+    core.load_settings(client=FakeClient(), snapshot_path=snapshot_path)
+    assert sorted(core.settings_status['recompiled']) == sorted(core.SETTINGS_SHEETS)
+
+    changed = dict(SHEETS, Terminology=SHEETS["Terminology"] + [["beef", "لحم بقري"]])
+    settings = core.load_settings(client=FakeClient(changed, revision="2026-01-02T00:00:00.000Z"), snapshot_path=snapshot_path)
+    assert core.settings_status['recompiled'] == ['terminology']
+    assert settings.term_dict[core.normalize_text("beef")] == "لحم بقري"
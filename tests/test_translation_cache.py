@@ -0,0 +1,85 @@
+# The persistent machine-translation cache: hits skip the backend, entries older than the TTL are
+# fetched again, and past max_rows the least recently used entries are evicted.
+import time
+
+import pytest
+
+import oct_core as core
+
+class Clock:
+    # Stands in for the time module inside oct_core; only time.time() is controlled
+    def __init__(self, now=1_000_000.0): self.now = now
+    def time(self): return self.now
+    def __getattr__(self, name): return getattr(time, name)
+
+class StubBackend:
+    def __init__(self): self.prompts = []
+    def __call__(self, prompt, tgt_lang):
+        self.prompts.append(prompt)
+        return f"{tgt_lang}:{prompt}"
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(core, 'time', clock)
+    return clock
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "translations.sqlite")
+
+def translate(chunks, cache, backend):
+    return core.translate_many(chunks, 'en', 'ar', backend=backend, cache=cache, limiter=core.RateLimiter(0))
+
+def test_hit_skips_backend_and_is_counted(clock, cache_path):
+    cache, backend = core.TranslationCache(cache_path), StubBackend()
+    first = translate(["Grilled Chicken", "Rice"], cache, backend)
+    second = translate(["Grilled Chicken", "Rice", "Rice"], cache, backend)
+    assert second == first == {"Grilled Chicken": "ar:Food: Grilled Chicken", "Rice": "ar:Food: Rice"}
+    assert len(backend.prompts) == 2
+    assert cache.stats() == {"hits": 2, "misses": 2, "size": 2}
+
+def test_entries_persist_across_instances(clock, cache_path):
+    translate(["Hummus"], core.TranslationCache(cache_path), StubBackend())
+    backend = StubBackend()
+    assert translate(["Hummus"], core.TranslationCache(cache_path), backend) == {"Hummus": "ar:Food: Hummus"}
+    assert backend.prompts == []
+
+def test_expired_entry_is_fetched_again(clock, cache_path):
+    cache, backend = core.TranslationCache(cache_path, ttl=3600), StubBackend()
+    translate(["Falafel"], cache, backend)
+    clock.now += 3600
+    translate(["Falafel"], cache, backend)
+    assert len(backend.prompts) == 1  # exactly at the TTL the entry is still served
+    clock.now += 1
+    translate(["Falafel"], cache, backend)
+    assert len(backend.prompts) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+    clock.now += 1
+    translate(["Falafel"], cache, backend)  # the refetch renewed the entry
+    assert len(backend.prompts) == 2
+
+def test_least_recently_used_entries_are_evicted_past_max_rows(clock, cache_path):
+    cache = core.TranslationCache(cache_path, max_rows=100)
+    # Eviction runs every 500 writes, so the cap is enforced on the 500th put
+    for i in range(499):
+        clock.now += 1
+        cache.put(f"item {i}", 'en', 'ar', f"صنف {i}")
+    clock.now += 1
+    assert cache.get("item 0", 'en', 'ar') == "صنف 0"  # the oldest write, now recently used
+    assert cache.stats()["size"] == 499
+    clock.now += 1
+    cache.put("item 499", 'en', 'ar', "صنف 499")
+    assert cache.stats()["size"] == 100
+    assert cache.get("item 0", 'en', 'ar') == "صنف 0"
+    assert cache.get("item 1", 'en', 'ar') is None
+    assert cache.get("item 400", 'en', 'ar') is None
+    assert cache.get("item 401", 'en', 'ar') == "صنف 401"
+    assert cache.get("item 499", 'en', 'ar') == "صنف 499"
+
+def test_eviction_drops_expired_entries(clock, cache_path):
+    cache = core.TranslationCache(cache_path, max_rows=1000, ttl=100)
+    cache.put("stale", 'en', 'ar', "قديم")
+    clock.now += 101
+    for i in range(499): cache.put(f"item {i}", 'en', 'ar', f"صنف {i}")
+    assert cache.stats()["size"] == 499
@@ -0,0 +1,80 @@
+# validate_frame, the bulk path used by every run, against validate_item row by row: same status,
+# error and action for every rule, with repeated items, empty cells and both sheet types.
+import sys
+import os
+
+import pandas as pd
+import pytest
+
+import oct_core as core
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from menu_gen import generate_menu, generate_settings_sheets
+
+SHEETS = {
+    'generic': [["combo"], ["meal"]],
+    'ad': [["order now"], ["best seller"]],
+    'forbidden': [["Word"], ["bacon"], ["wine"], ["curacao"]],
+    'safe_bacon': [["beef"], ["turkey"]],
+    'safe_curacao': [["syrup"]],
+    'desc_lib': [["Item Name", "Eng Desc", "Arb Desc"], ["Chicken Burger", "grilled chicken fillet in a bun", "برجر دجاج"]],
+}
+
+ROWS = [
+    ("Chicken Burger", "grilled chicken fillet with lettuce and mayo in a soft bun"),
+    ("Bacon Roll", "crispy bacon in a roll"),                         # forbidden in name
+    ("Club Sandwich", "toasted bread with wine sauce"),                # forbidden in description
+    ("Beef Bacon Roll", "beef bacon in a roll"),                       # safe bacon
+    ("Blue Lagoon", "curacao syrup with lemonade"),                    # safe curacao
+    ("Juice", "orange or apple"),                                      # choice separator
+    ("Pasta", "choice of penne and sauce"),                            # undefined choice
+    ("Tea / Coffee", "tea or coffee"),                                 # choice named in the item
+    ("Chicken Wrap", "tender beef strips in a wrap"),                  # mismatch
+    ("Family Meal", "a combo meal"),                                   # generic
+    ("Grilled Salmon", "delicious fresh grilled salmon"),              # no value added
+    ("Falafel Wrap", "falafel wrap"),                                  # identical to name
+    ("Latte", ""),                                                     # empty description
+    ("", "grilled halloumi with za'atar and tomato"),                  # empty name
+    ("", ""),
+    ("Chicken Wrap", "tender beef strips in a wrap"),                  # repeats of earlier rows
+    ("Bacon Roll", "crispy bacon in a roll"),
+    ("  Chicken Burger ", "grilled chicken fillet with lettuce and mayo in a soft bun"),
+]
+
+def settings_from(rows):
+    return core.build_settings({k: {'rows': rows.get(k, []), 'hash': None} for k in core.SETTINGS_SHEETS})[0]
+
+def per_row(df, sheet_type, s):
+    out = []
+    for row in df.to_dict('records'):
+        valid, _, err, act, _ = core.validate_item(row, sheet_type, s.generic_words, s.forbidden_words, s.ad_words,
+                                                   s.suggestion_index, s.safe_bacon, s.safe_curacao)
+        out.append(("Valid", "", "") if valid else ("Issue", err, act))
+    return out
+
+def bulk(df, sheet_type, s):
+    checks = core.validate_frame(df, sheet_type, core.settings_ruleset(s))
+    return list(checks[['Status', 'Error', 'Action']].itertuples(index=False, name=None))
+
+@pytest.mark.parametrize("sheet_type", ["Main Menu", "Sep Sheet"])
+def test_matches_validate_item_on_every_rule(sheet_type):
+    s = settings_from(SHEETS)
+    df = pd.DataFrame(ROWS, columns=['Item Name', 'Description'])
+    expected = per_row(df, sheet_type, s)
+    assert bulk(df, sheet_type, s) == expected
+    assert len({e for _, e, _ in expected if e}) >= 7  # the rows above really exercise the rules
+
+@pytest.mark.parametrize("sheet_type", ["Main Menu", "Sep Sheet"])
+def test_matches_validate_item_on_generated_menu(sheet_type):
+    s = core.build_settings(generate_settings_sheets(200, seed=3))[0]
+    df = generate_menu(600, seed=3)
+    checks = core.validate_frame(df, sheet_type, core.settings_ruleset(s))
+    assert checks.attrs['unique_rows'] < len(df)
+    assert bulk(df, sheet_type, s) == per_row(df, sheet_type, s)
+
+def test_keeps_index_and_handles_missing_columns():
+    s = settings_from(SHEETS)
+    df = pd.DataFrame({'Item Name': ["Bacon Roll", "Fries"]}, index=[10, 20])
+    checks = core.validate_frame(df, "Main Menu", core.settings_ruleset(s))
+    assert list(checks.index) == [10, 20]
+    assert bulk(df, "Main Menu", s) == per_row(df, "Main Menu", s)
@@ -0,0 +1,48 @@
+# process_workbook, the CLI and batch pipeline: the written file keeps the per-row check results
+# and drops the translation provenance columns.
+from io import BytesIO
+
+import pandas as pd
+
+import oct_core as core
+
+MENU = pd.DataFrame({
+    'Item Name': ["Chicken Burger", "Bacon Roll", "Beef Burger"],
+    'Description': ["grilled chicken with cheese", "crispy bacon roll", "beef burger"],
+    'Price': [25.0, 18.5, 30.0],
+})
+
+def settings():
+    sheets = {
+        'forbidden': [["Word"], ["bacon"]],
+        'terminology': [["English", "Arabic"], ["chicken", "دجاج"], ["burger", "برجر"]],
+    }
+    return core.build_settings({k: {'rows': sheets.get(k, []), 'hash': None} for k in core.SETTINGS_SHEETS})[0]
+
+def check_opts(mode="Check Errors Only"):
+    return {'sheet': None, 'name_col': None, 'desc_col': None, 'sheet_type': "Main Menu", 'action_mode': mode, 'source_lang': "English"}
+
+def test_check_mode_csv_keeps_check_columns():
+    data = MENU.to_csv(index=False).encode()
+    payload, result_df, _ = core.process_workbook(data, "menu.csv", settings(), check_opts())
+    out = pd.read_csv(BytesIO(payload), encoding='utf-8-sig', keep_default_na=False)
+    assert list(out.columns) == ['Item Name', 'Description', 'Price', 'Status', 'Error', 'Action']
+    assert out.loc[1, 'Status'] == "Issue" and out.loc[1, 'Error'] == "Forbidden in Name: bacon"
+    assert list(out['Status']) == list(result_df['Status'])
+
+def test_check_mode_xlsx_keeps_check_columns():
+    out = BytesIO()
+    MENU.to_excel(out, index=False, sheet_name="Menu")
+    payload, _, _ = core.process_workbook(out.getvalue(), "menu.xlsx", settings(), check_opts())
+    written = pd.read_excel(BytesIO(payload), sheet_name="Menu")
+    assert {'Status', 'Error', 'Action'} <= set(written.columns)
+
+def test_translation_provenance_is_dropped(monkeypatch):
+    monkeypatch.setattr(core, 'google_translate', lambda prompt, tgt_lang: f"[{tgt_lang}] {prompt}")
+    monkeypatch.setitem(core._shared, 'translation_cache', core.TranslationCache(":memory:"))
+    data = MENU.to_csv(index=False).encode()
+    payload, result_df, _ = core.process_workbook(data, "menu.csv", settings(), check_opts("Check & Translate"))
+    out = pd.read_csv(BytesIO(payload), encoding='utf-8-sig', keep_default_na=False)
+    assert 'Name Source' in result_df.columns
+    assert {'Status', 'Error', 'Action', 'Name (Translated)', 'Desc (Translated)'} <= set(out.columns)
+    assert not {'Name Source', 'Desc Source'} & set(out.columns)